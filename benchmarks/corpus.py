@@ -0,0 +1,66 @@
+"""Generators for synthetic variables.tf files used by the benchmarks."""
+
+from __future__ import annotations
+
+from typing import List
+
+
+def nested_type(depth: int) -> str:
+    """``object({...})``/``map(...)`` type nested ``depth`` levels deep."""
+    expr = "string"
+    for level in range(depth):
+        if level % 2:
+            expr = f"map({expr})"
+        else:
+            expr = f"object({{name = string, size = number, child = {expr}}})"
+    return expr
+
+
+def nested_default(depth: int) -> str:
+    expr = '"leaf"'
+    for level in range(depth):
+        expr = f'{{name = "n{level}", size = {level}, child = {expr}}}'
+    return expr
+
+
+def list_default(length: int) -> str:
+    return "[" + ", ".join(f'"item-{i}"' for i in range(length)) + "]"
+
+
+def variable_block(
+    index: int, depth: int = 0, list_length: int = 0, override: bool = False
+) -> str:
+    lines = [f'variable "var_{index:06d}" {{']
+    if override:
+        lines.append("  #tfdocs: type=object")
+    lines.append(f"  type = {nested_type(depth) if depth else 'string'}")
+    lines.append(f'  description = "Variable number {index}"')
+    if list_length:
+        lines.append("  default = [")
+        lines.extend(f'    "item-{i}",' for i in range(list_length))
+        lines.append("  ]")
+    elif depth:
+        lines.append(f"  default = {nested_default(depth)}")
+    else:
+        lines.append(f'  default = "value-{index}"')
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def variables_file(
+    count: int, depth: int = 0, list_length: int = 0, override: bool = False
+) -> str:
+    # Reverse order so formatting always has to sort.
+    blocks: List[str] = [
+        variable_block(i, depth, list_length, override) for i in reversed(range(count))
+    ]
+    return "\n\n".join(blocks) + "\n"
+
+
+# name -> (generator options, largest variable count worth generating)
+SCENARIOS = {
+    "flat": (dict(), 100_000),
+    "nested": (dict(depth=6), 10_000),
+    "long_lists": (dict(list_length=200), 1_000),
+    "overrides": (dict(override=True), 100_000),
+}
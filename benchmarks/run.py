@@ -0,0 +1,229 @@
+"""
+Micro-benchmarks for the parser and formatter.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --sizes 10,1000 --scenarios flat,nested
+
+Every benchmark reports the best of ``--repeat`` runs in seconds. Memory is
+measured once with tracemalloc: the peak of parsing a module, and what the
+parsed variables retain as records compared to the dicts they replaced.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import SCENARIOS, list_default, nested_type, variables_file
+from tfdocs import __version__
+from tfdocs import utils
+from tfdocs.readme import Readme, Variable, VariablesView
+
+DEFAULT_SIZES = [10, 1_000, 10_000, 100_000]
+
+
+def best_of(
+    func: Callable[..., object],
+    repeat: int,
+    setup: Optional[Callable[[], Any]] = None,
+) -> float:
+    """
+    Best time of ``repeat`` calls of ``func``. With ``setup``, its result is
+    passed to ``func`` and the time spent in it is not counted.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def traced_bytes(func: Callable[[], object]) -> Tuple[int, int]:
+    """(retained, peak) bytes allocated by ``func``, keeping its result alive."""
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+def as_dicts(rd: Readme) -> object:
+    """The list of dicts plus sorted copy Readme used to keep per module."""
+    variables = [dict(item) for item in rd.variables]
+    return variables, sorted(variables, key=lambda k: k["name"])
+
+
+def as_records(rd: Readme) -> object:
+    variables = [
+        Variable(item.name, item.type_override, item.type, item.description, item.default)
+        for item in rd.variables
+    ]
+    return variables, VariablesView(variables)
+
+
+def bench_memory(scenario: str, size: int) -> List[Dict[str, object]]:
+    options, _ = SCENARIOS[scenario]
+    text = variables_file(size, **options)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        variables_path = os.path.join(tmp, "variables.tf")
+        readme_path = os.path.join(tmp, "README.md")
+        with open(variables_path, "w") as file:
+            file.write(text)
+
+        rd = Readme(readme_path, variables_path, "bench", "bench-source")
+        measurements = {
+            "Readme.__init__": traced_bytes(
+                lambda: Readme(readme_path, variables_path, "bench", "bench-source")
+            ),
+            "variables as dicts": traced_bytes(lambda: as_dicts(rd)),
+            "variables as records": traced_bytes(lambda: as_records(rd)),
+        }
+
+    return [
+        {
+            "scenario": scenario,
+            "variables": size,
+            "benchmark": name,
+            "retained_bytes": retained,
+            "peak_bytes": peak,
+        }
+        for name, (retained, peak) in measurements.items()
+    ]
+
+
+def bench_module(scenario: str, size: int, repeat: int) -> List[Dict[str, object]]:
+    options, _ = SCENARIOS[scenario]
+    text = variables_file(size, **options)
+    expression = (
+        list_default(options.get("list_length", 0) or 10)
+        if not options.get("depth")
+        else nested_type(options["depth"])
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        variables_path = os.path.join(tmp, "variables.tf")
+        readme_path = os.path.join(tmp, "README.md")
+        with open(variables_path, "w") as file:
+            file.write(text)
+
+        def parse() -> Readme:
+            return Readme(readme_path, variables_path, "bench", "bench-source")
+
+        def construct_tf_file(rd: Readme) -> str:
+            utils.clear_format_cache()
+            return utils.construct_tf_file(rd.sorted_variables)
+
+        def construct_readme(rd: Readme) -> List[str]:
+            utils.clear_format_cache()
+            return rd.construct_readme()
+
+        def parse_uncached() -> Readme:
+            utils.clear_format_cache()
+            return parse()
+
+        # Readme caches its renders and formatted expressions are memoized, so
+        # every run gets a fresh Readme and an empty memo.
+        timings = {
+            "count_blocks": best_of(lambda: utils.count_blocks(text), repeat),
+            "smart_split": best_of(lambda: utils.smart_split(expression[1:-1]), repeat),
+            "format_block": best_of(lambda: utils.format_block(expression, inline=True), repeat),
+            "construct_tf_file": best_of(construct_tf_file, repeat, setup=parse),
+            "Readme.__init__": best_of(parse_uncached, repeat),
+            "construct_readme": best_of(construct_readme, repeat, setup=parse),
+        }
+
+    return [
+        {
+            "scenario": scenario,
+            "variables": size,
+            "bytes": len(text.encode()),
+            "benchmark": name,
+            "seconds": seconds,
+        }
+        for name, seconds in timings.items()
+    ]
+
+
+def run_suite(
+    sizes: List[int], scenarios: List[str], repeat: int = 3
+) -> Dict[str, object]:
+    results: List[Dict[str, object]] = []
+    memory: List[Dict[str, object]] = []
+
+    for scenario in scenarios:
+        _, max_size = SCENARIOS[scenario]
+        for size in sizes:
+            if size <= max_size:
+                results.extend(bench_module(scenario, size, repeat))
+                memory.extend(bench_memory(scenario, size))
+
+    return {
+        "tfdocs": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+        "memory": memory,
+    }
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="Comma separated variable counts",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="Comma separated scenarios (%s)" % ", ".join(SCENARIOS),
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", "-o", default=None, help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    report = run_suite(
+        [int(s) for s in args.sizes.split(",")],
+        args.scenarios.split(","),
+        args.repeat,
+    )
+
+    for row in report["results"]:
+        print(
+            f"{row['scenario']:<12} {row['variables']:>7} {row['benchmark']:<18} "
+            f"{row['seconds'] * 1000:10.3f} ms",
+            file=sys.stderr,
+        )
+
+    for row in report["memory"]:
+        print(
+            f"{row['scenario']:<12} {row['variables']:>7} {row['benchmark']:<22} "
+            f"{row['retained_bytes'] / 1024:10.1f} KiB retained "
+            f"{row['peak_bytes'] / 1024:10.1f} KiB peak",
+            file=sys.stderr,
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -20,6 +20,35 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 from tfdocs.version import __version__
 
-__all__ = ("__version__",)
+__all__ = (
+    "__version__",
+    "Options",
+    "Result",
+    "TfdocsError",
+    "VariablesFileNotFoundError",
+    "render",
+    "render_async",
+)
+
+# The library API is imported on first access so that `tfdocs --version`
+# and other CLI paths do not pay for it.
+_LAZY = {
+    "Options": "tfdocs.cli",
+    "Result": "tfdocs.api",
+    "render": "tfdocs.api",
+    "render_async": "tfdocs.api",
+    "TfdocsError": "tfdocs.errors",
+    "VariablesFileNotFoundError": "tfdocs.errors",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        import importlib
+
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module 'tfdocs' has no attribute {name!r}")
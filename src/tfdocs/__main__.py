@@ -6,13 +6,18 @@
 from __future__ import annotations
 
 import errno
+import os
 import sys
 from pathlib import Path
+from typing import Iterable
 
-from rich.console import Console
-
+from tfdocs import batch
+from tfdocs import cache
 from tfdocs import cli
 from tfdocs import readme
+from tfdocs import timings
+from tfdocs.errors import TfdocsError
+from tfdocs.output import echo
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -25,23 +30,145 @@ def main(argv: list[str] | None = None) -> None:
 
     options = cli.get_parser(argv[1:])
 
+    if options.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(_run_timed, options)
+        finally:
+            profiler.dump_stats(options.profile)
+
+    _run_timed(options)
+
+
+def _run_timed(options: cli.Options) -> None:
+    if not options.timings:
+        run(options)
+        return
+
+    with timings.record() as recorder:
+        try:
+            run(options)
+        finally:
+            print(
+                timings.format_timings(recorder, options.timings_format),
+                file=sys.stderr,
+            )
+
+
+def run(options: cli.Options) -> None:
+    """Run tfdocs with parsed options. Always exits via sys.exit(..)."""
     if options.version:
         print(f"tfdocs {cli.get_version()}")
         sys.exit(0)
 
+    if options.serve:
+        if not options.stdio:
+            echo("[red]ERROR:[/] tfdocs serve requires --stdio")
+            sys.exit(-1)
+
+        from tfdocs import server
+
+        server.serve_stdio(options)
+        sys.exit(0)
+
+    if options.watch:
+        from tfdocs import watch
+
+        watch.watch(options.paths or ["."], options)
+        sys.exit(0)
+
+    if options.recursive or options.paths or options.changed_since:
+        roots = ([options.recursive] if options.recursive else []) + options.paths
+        if options.changed_since:
+            try:
+                modules = batch.changed_modules(
+                    roots or ["."], options.changed_since, options
+                )
+            except TfdocsError as exc:
+                echo(f"[red]ERROR:[/] {exc}")
+                sys.exit(-1)
+        else:
+            modules = [
+                module
+                for root in roots
+                for module in batch.find_modules(root, options.variables_file)
+            ]
+        result_cache = None if options.no_cache else cache.ResultCache()
+        # Worker processes are invisible to the profiler.
+        jobs = 1 if options.profile else options.jobs
+        results = batch.run_modules(modules, options, jobs, result_cache)
+        if result_cache is not None:
+            result_cache.close()
+        for result in results:
+            if result.timings is not None:
+                timings.add_module(result.module_dir, result.timings)
+        if options.emit_index:
+            emit_index(batch.index_records(results, options), options)
+        if options.check:
+            report_check_and_exit(results, options)
+        report_modules_and_exit(results, options)
+
     module_name = options.module_name or Path.cwd().name
 
-    rd = readme.Readme(
-        options.readme_file,
-        options.variables_file,
-        module_name,
-        options.source,
-        options.git_source,
-    )
+    # Dry runs print the generated files, so they always need a full render.
+    result_cache = None
+    cache_key = None
+    if not options.no_cache and not options.dry_run:
+        result_cache = cache.ResultCache()
+        cache_key = cache.cache_key(
+            options, options.variables_file, options.readme_file, module_name
+        )
+        if result_cache.hit(cache_key):
+            result_cache.close()
+            if options.emit_index:
+                emit_index(
+                    batch.index_records([batch.ModuleResult(".")], options, module_name),
+                    options,
+                )
+            if options.check:
+                report_check_and_exit(
+                    [batch.ModuleResult(".", {"readme": False, "variables": False})],
+                    options,
+                )
+            report_and_exit(
+                {"readme": False, "variables": False},
+                options.readme_file,
+                options.variables_file,
+                options.format,
+                options.dry_run,
+            )
+
+    try:
+        rd = readme.Readme(
+            options.readme_file,
+            options.variables_file,
+            module_name,
+            options.source,
+            options.git_source,
+            scan_module=options.all_files,
+        )
+    except TfdocsError as exc:
+        echo(f"[red]ERROR:[/] {exc}")
+        sys.exit(-1)
 
-    if not options.dry_run and options.format:
+    if not options.check and not options.dry_run and options.format:
         rd.write_variables()
 
+    # The spans in the index point into the variables file as it is on disk.
+    if options.emit_index:
+        emit_index(
+            batch.index_records([batch.ModuleResult(".")], options, module_name), options
+        )
+
+    if options.check:
+        if result_cache is not None:
+            if cache.is_clean(rd.get_status(), options):
+                result_cache.add(cache_key)
+            result_cache.close()
+        report_check_and_exit([batch.ModuleResult(".", rd.get_status())], options)
+
     if options.dry_run:
         if options.format:
             rd.print_variables_file()
@@ -65,6 +192,12 @@ def main(argv: list[str] | None = None) -> None:
         )
 
     rd.write_readme()
+
+    if result_cache is not None:
+        if cache.is_clean(rd.get_status(), options):
+            result_cache.add(cache_key)
+        result_cache.close()
+
     report_and_exit(
         rd.get_status(),
         options.readme_file,
@@ -74,6 +207,20 @@ def main(argv: list[str] | None = None) -> None:
     )
 
 
+def emit_index(records: Iterable[dict], options: cli.Options) -> None:
+    """Write the --emit-index file from ``records``, exit -1 if that fails."""
+    from tfdocs import index
+
+    try:
+        index.write_records(options.emit_index, records)
+    except TfdocsError as exc:
+        echo(f"[red]ERROR:[/] {exc}")
+        sys.exit(-1)
+    except OSError as exc:
+        echo(f"[red]ERROR:[/] Cannot write {options.emit_index}: {exc}")
+        sys.exit(-1)
+
+
 def report_and_exit(
     status: dict[str, bool],
     readme_file: str,
@@ -85,7 +232,81 @@ def report_and_exit(
     Print a summary and exit with the expected codes.
     Exits -1 when there are updates/pending updates; 0 otherwise.
     """
-    console = Console()
+    _print_summary_and_exit(
+        _changed_files(status, readme_file, variables_file, format_variables),
+        dry_run,
+    )
+
+
+def report_modules_and_exit(
+    results: list[batch.ModuleResult], options: cli.Options
+) -> None:
+    """
+    Combined summary for a multi-module run. Failed modules are reported
+    individually and count as pending updates for the exit code.
+    """
+    changed_files: list[str] = []
+    failed = False
+
+    for result in results:
+        if result.error:
+            failed = True
+            echo(f"[red]ERROR:[/] {result.module_dir}: {result.error}")
+            continue
+
+        changed_files.extend(
+            _changed_files(
+                result.status,
+                os.path.join(result.module_dir, options.readme_file),
+                os.path.join(result.module_dir, options.variables_file),
+                options.format,
+            )
+        )
+
+    if failed and not changed_files:
+        sys.exit(-1)
+
+    _print_summary_and_exit(changed_files, options.dry_run)
+
+
+def report_check_and_exit(
+    results: list[batch.ModuleResult], options: cli.Options
+) -> None:
+    """
+    Print one line per checked file and exit -1 when any of them is stale
+    or a module could not be processed; 0 otherwise.
+    """
+    failed = False
+
+    for result in results:
+        if result.error:
+            failed = True
+            echo(f"[red]ERROR:[/] {result.module_dir}: {result.error}")
+            continue
+
+        checked = [
+            (options.readme_file, result.status.get("readme")),
+        ]
+        if options.format:
+            checked.append((options.variables_file, result.status.get("variables")))
+
+        for file_name, stale in checked:
+            path = os.path.normpath(os.path.join(result.module_dir, file_name))
+            if stale:
+                failed = True
+                echo(f"[red]stale:[/] {path}")
+            else:
+                echo(f"[green]ok:[/] {path}")
+
+    sys.exit(-1 if failed else 0)
+
+
+def _changed_files(
+    status: dict[str, bool],
+    readme_file: str,
+    variables_file: str,
+    format_variables: bool,
+) -> list[str]:
     changed_files: list[str] = []
 
     if status.get("readme"):
@@ -94,16 +315,20 @@ def report_and_exit(
     if format_variables and status.get("variables"):
         changed_files.append(variables_file)
 
+    return changed_files
+
+
+def _print_summary_and_exit(changed_files: list[str], dry_run: bool) -> None:
     if changed_files:
         changed_list = ", ".join(changed_files)
-        console.print(
+        echo(
             f"[green]Updated:[/] {changed_list}"
             if not dry_run
             else f"[yellow]Pending changes:[/] {changed_list}"
         )
         sys.exit(-1)
     else:
-        console.print("[cyan]Nothing to update!!![/]")
+        echo("[cyan]Nothing to update!!![/]")
         sys.exit(0)
 
 
@@ -0,0 +1,76 @@
+"""
+Library interface: render a module in-process and get the result back
+instead of output on the console and a process exit code.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from tfdocs import readme
+from tfdocs.cli import Options
+
+
+@dataclass
+class Result:
+    module_dir: str
+    variables: str
+    readme: str
+    variables_changed: bool
+    readme_changed: bool
+    written: bool = False
+
+
+def render(
+    module_dir: str = ".", options: Optional[Options] = None, write: bool = False
+) -> Result:
+    """
+    Parse and render the module in ``module_dir``. With ``write`` the README
+    (and the variables file when ``options.format`` is set) are written like
+    the CLI does; ``Result.written`` tells whether any file actually changed
+    on disk. Raises VariablesFileNotFoundError for a missing variables
+    file; never prints and never exits.
+    """
+    options = options or Options()
+
+    rd = readme.Readme(
+        os.path.join(module_dir, options.readme_file),
+        os.path.join(module_dir, options.variables_file),
+        options.module_name or os.path.basename(os.path.abspath(module_dir)),
+        options.source,
+        options.git_source,
+        module_path=module_dir,
+        scan_module=options.all_files,
+    )
+    readme_text = rd.readme_text()
+    variables_text = rd.variables_text()
+    status = rd.get_status()
+
+    written = False
+    if write:
+        if options.format:
+            written = rd.write_variables()
+        written = rd.write_readme() or written
+
+    return Result(
+        module_dir,
+        variables_text,
+        readme_text,
+        status["variables"],
+        status["readme"],
+        written=written,
+    )
+
+
+async def render_async(
+    module_dir: str = ".", options: Optional[Options] = None, write: bool = False
+) -> Result:
+    """render() on the event loop's default executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, functools.partial(render, module_dir, options, write)
+    )
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from tfdocs import gitsource, readme, timings
+from tfdocs.cache import ResultCache, cache_key, is_clean
+from tfdocs.cli import Options
+from tfdocs.errors import GitError
+
+
+@dataclass
+class ModuleResult:
+    module_dir: str
+    status: Dict[str, bool] = field(default_factory=dict)
+    error: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None
+    # The --emit-index line of the module, built after its files were written.
+    index_record: Optional[Dict[str, Any]] = None
+
+
+def find_modules(root: str, variables_file: str = "variables.tf") -> List[str]:
+    """
+    Walk ``root`` and return every directory containing ``variables_file``.
+    Hidden directories (.git, .terraform, ...) are skipped.
+    """
+    modules: List[str] = []
+
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        if os.path.isfile(os.path.join(dirpath, variables_file)):
+            modules.append(dirpath)
+
+    return modules
+
+
+def changed_modules(roots: List[str], ref: str, options: Options) -> List[str]:
+    """
+    Return the modules below ``roots`` whose variables file or README (any
+    *.tf file with --all-files) changed since the merge base of ``ref`` and
+    the working tree. git is run once per repository; modules without
+    changes are never read.
+    """
+    repos: Dict[str, List[str]] = {}
+    for root in roots:
+        repo = gitsource.find_repo(root)
+        if repo is None:
+            raise GitError(f"{root} is not in a git repository")
+        repos.setdefault(repo[0], []).append(root)
+
+    modules = set()
+    for work_tree, repo_roots in repos.items():
+        for path in _changed_paths(work_tree, ref):
+            name = os.path.basename(path)
+            if name not in (options.variables_file, options.readme_file) and not (
+                options.all_files and name.endswith(".tf")
+            ):
+                continue
+
+            module_dir = os.path.dirname(os.path.join(work_tree, path))
+            if not os.path.isfile(os.path.join(module_dir, options.variables_file)):
+                continue  # deleted, or not a module
+
+            for root in repo_roots:
+                rel_path = os.path.relpath(module_dir, os.path.abspath(root))
+                parts = rel_path.split(os.sep)
+                if parts[0] == os.pardir or any(
+                    part.startswith(".") for part in parts if part != os.curdir
+                ):
+                    continue
+                if rel_path != os.curdir:
+                    root = os.path.join(root, rel_path)
+                modules.add(root)
+                break
+
+    return sorted(modules)
+
+
+def _changed_paths(work_tree: str, ref: str) -> List[str]:
+    import subprocess
+
+    command = ["git", "-C", work_tree, "diff", "--name-only", "-z", "--merge-base", ref]
+    try:
+        result = subprocess.run(command, capture_output=True)
+    except OSError as exc:
+        raise GitError(f"Cannot run git: {exc}") from exc
+
+    if result.returncode != 0:
+        message = os.fsdecode(result.stderr).strip() or f"exit status {result.returncode}"
+        raise GitError(f"git diff --merge-base {ref} failed: {message}")
+
+    return [os.fsdecode(path) for path in result.stdout.split(b"\0") if path]
+
+
+def process_module(module_dir: str, options: Options) -> ModuleResult:
+    """
+    Run the parse/format/render pipeline for a single module directory.
+    Used as the worker function of the process pool, so it must stay
+    importable at module level and must never exit the process.
+    """
+    if not options.timings:
+        return _process_module(module_dir, options)
+
+    with timings.record() as recorder:
+        result = _process_module(module_dir, options)
+    result.timings = recorder.phases
+    return result
+
+
+def _process_module(module_dir: str, options: Options) -> ModuleResult:
+    try:
+        rd = readme.Readme(
+            os.path.join(module_dir, options.readme_file),
+            os.path.join(module_dir, options.variables_file),
+            os.path.basename(os.path.abspath(module_dir)),
+            options.source,
+            options.git_source,
+            module_path=module_dir,
+            scan_module=options.all_files,
+        )
+
+        if options.dry_run or options.check:
+            rd.get_status()
+        else:
+            if options.format:
+                rd.write_variables()
+            rd.write_readme()
+
+        result = ModuleResult(module_dir, rd.get_status())
+        if options.emit_index:
+            from tfdocs import index
+
+            result.index_record = index.module_record(module_dir, options)
+        return result
+    except Exception as exc:
+        return ModuleResult(module_dir, error=str(exc) or type(exc).__name__)
+
+
+def index_records(
+    results: Iterable[ModuleResult], options: Options, module_name: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    The --emit-index lines of the modules processed without errors. Only
+    modules that were not processed (cache hits) are parsed here.
+    """
+    from tfdocs import index
+
+    for result in results:
+        if result.error:
+            continue
+        if result.index_record is not None:
+            yield result.index_record
+        else:
+            yield index.module_record(result.module_dir, options, module_name)
+
+
+def module_cache_key(module_dir: str, options: Options) -> Optional[str]:
+    return cache_key(
+        options,
+        os.path.join(module_dir, options.variables_file),
+        os.path.join(module_dir, options.readme_file),
+        os.path.basename(os.path.abspath(module_dir)),
+        module_dir,
+    )
+
+
+def run_modules(
+    module_dirs: List[str],
+    options: Options,
+    jobs: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+) -> List[ModuleResult]:
+    """
+    Process ``module_dirs`` on a pool of ``jobs`` worker processes and return
+    the results in the same order. A single job runs in-process.
+    Modules found in ``cache`` are reported as up to date without being
+    parsed; modules that turn out to be up to date are added to it.
+    """
+    results: Dict[str, ModuleResult] = {}
+    keys: Dict[str, Optional[str]] = {}
+    pending: List[str] = []
+
+    for module_dir in module_dirs:
+        if cache is not None:
+            keys[module_dir] = module_cache_key(module_dir, options)
+            if cache.hit(keys[module_dir]):
+                results[module_dir] = ModuleResult(
+                    module_dir, {"readme": False, "variables": False}
+                )
+                continue
+        pending.append(module_dir)
+
+    for result in _run_pending(pending, options, jobs):
+        results[result.module_dir] = result
+        if cache is not None and not result.error and is_clean(result.status, options):
+            cache.add(keys[result.module_dir])
+
+    return [results[module_dir] for module_dir in module_dirs]
+
+
+def _run_pending(
+    module_dirs: List[str], options: Options, jobs: Optional[int]
+) -> List[ModuleResult]:
+    jobs = jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(module_dirs))
+
+    if jobs <= 1:
+        return [process_module(module_dir, options) for module_dir in module_dirs]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(module_dirs) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(
+            pool.map(process_module, module_dirs, repeat(options), chunksize=chunksize)
+        )
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+from tfdocs import gitsource
+from tfdocs.cli import Options
+from tfdocs.version import __version__
+
+DEFAULT_MAX_ENTRIES = 10000
+
+# Options that change the generated output. Anything else (jobs, dry-run,
+# ...) does not influence whether a module is up to date.
+_KEY_OPTIONS = (
+    "format",
+    "variables_file",
+    "readme_file",
+    "source",
+    "git_source",
+    "all_files",
+)
+
+
+def default_cache_dir() -> str:
+    if os.environ.get("TFDOCS_CACHE_DIR"):
+        return os.environ["TFDOCS_CACHE_DIR"]
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "tfdocs")
+
+
+def cache_key(
+    options: Options,
+    variables_path: str,
+    readme_path: str,
+    module_name: Optional[str],
+    module_path: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Hash everything the generated output depends on: the variables and README
+    bytes (plus the other .tf files with --all-files), the module name and
+    location, the git repository and origin the module source is derived
+    from, the relevant CLI options and the tfdocs version. Returns None when
+    the variables file cannot be read or the source cannot be resolved
+    without git.
+    """
+    module_path = os.path.abspath(module_path or os.getcwd())
+    source = _source_inputs(options, module_path)
+    if source is None:
+        return None
+
+    digest = hashlib.sha256()
+    digest.update(__version__.encode())
+    digest.update(module_path.encode())
+    digest.update(f"\0{module_name}\0source={source!r}".encode())
+
+    for name in _KEY_OPTIONS:
+        digest.update(f"\0{name}={getattr(options, name)!r}".encode())
+
+    try:
+        with open(variables_path, "rb") as file:
+            digest.update(b"\0variables\0" + file.read())
+    except OSError:
+        return None
+
+    if options.all_files:
+        variables_abspath = os.path.abspath(variables_path)
+        directory = os.path.dirname(variables_abspath)
+        for path in sorted(glob.glob(os.path.join(glob.escape(directory), "*.tf"))):
+            if path != variables_abspath:
+                with open(path, "rb") as file:
+                    digest.update(f"\0{os.path.basename(path)}\0".encode() + file.read())
+
+    try:
+        with open(readme_path, "rb") as file:
+            digest.update(b"\0readme\0" + file.read())
+    except OSError:
+        digest.update(b"\0no-readme")
+
+    return digest.hexdigest()
+
+
+def _source_inputs(options: Options, module_path: str) -> Optional[Tuple[str, ...]]:
+    """
+    What generate_source() reads besides the options: the repository root and
+    the origin URL. None for the setups it hands over to git (GIT_DIR, origin
+    missing from the config), which cannot be checked cheaply.
+    """
+    if options.source and not options.git_source:
+        return ()
+    if "GIT_DIR" in os.environ:
+        return None
+
+    repo = gitsource.find_repo(module_path)
+    if repo is None:
+        return ("no-repo",)
+
+    repo_root, git_dir = repo
+    origin = options.source or gitsource.origin_url(git_dir)
+    if not origin:
+        return None
+    return (repo_root, origin)
+
+
+def is_clean(status: Dict[str, bool], options: Options) -> bool:
+    """True when a run with ``status`` has nothing to report."""
+    return not status.get("readme") and not (
+        options.format and status.get("variables")
+    )
+
+
+class ResultCache:
+    """
+    Persistent set of cache keys known to be up to date, stored in SQLite and
+    capped at ``max_entries`` with least-recently-used eviction. Lookups are
+    plain reads; hits and additions are kept in memory and written in one
+    short transaction on close(), so concurrent runs sharing the cache never
+    wait on each other for longer than that. Only ever used from a single
+    process.
+    """
+
+    def __init__(
+        self, directory: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> None:
+        self.max_entries = max_entries
+        self.directory = directory or default_cache_dir()
+        self._db: Optional[sqlite3.Connection] = None
+        # Keys hit or added during this run, with their last use.
+        self._touched: Dict[str, float] = {}
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(self.directory, "results.sqlite3"), timeout=5
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries"
+                " (key TEXT PRIMARY KEY, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+        except (OSError, sqlite3.Error):
+            # A read-only or broken cache must never break a run.
+            self._db = None
+
+    def hit(self, key: Optional[str]) -> bool:
+        if self._db is None or key is None:
+            return False
+
+        if key not in self._touched:
+            try:
+                rows = self._db.execute(
+                    "SELECT 1 FROM entries WHERE key = ?", (key,)
+                ).fetchall()
+            except sqlite3.Error:
+                return False
+            if not rows:
+                return False
+
+        self._touched[key] = time.time()
+        return True
+
+    def add(self, key: Optional[str]) -> None:
+        if self._db is None or key is None:
+            return
+        self._touched[key] = time.time()
+
+    def __len__(self) -> int:
+        if self._db is None:
+            return 0
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """Record the keys used in this run, evict above the cap and commit."""
+        if self._db is None:
+            return
+
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO entries (key, last_used) VALUES (?, ?)",
+                self._touched.items(),
+            )
+            self._db.execute(
+                "DELETE FROM entries WHERE key NOT IN"
+                " (SELECT key FROM entries ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+        except sqlite3.Error:
+            pass
+        finally:
+            self._db.close()
+            self._db = None
+            self._touched.clear()
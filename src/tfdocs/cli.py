@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import argparse
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from tfdocs import __version__
 
@@ -16,10 +16,25 @@ class Options:
     source: str | None = None
     git_source: bool = False
     module_name: str | None = None
+    recursive: str | None = None
+    changed_since: str | None = None
+    jobs: int | None = None
+    no_cache: bool = False
+    all_files: bool = False
+    watch: bool = False
+    check: bool = False
+    serve: bool = False
+    stdio: bool = False
+    timings: bool = False
+    timings_format: str = "text"
+    profile: str | None = None
+    emit_index: str | None = None
+    paths: list[str] = field(default_factory=list)
 
 
 def get_parser(arguments: list[str]) -> Options:
     parser = argparse.ArgumentParser(
+        usage="%(prog)s [serve --stdio] [options] [PATHS ...]",
         formatter_class=argparse.RawTextHelpFormatter,
     )
 
@@ -45,6 +60,13 @@ def get_parser(arguments: list[str]) -> Options:
         default="variables.tf",
         help="Specify the name of the file containing variables (default: variables.tf)",
     )
+    parser.add_argument(
+        "--all-files",
+        dest="all_files",
+        default=False,
+        action="store_true",
+        help="Document the variables of every *.tf file in the module directory, not only the variables file",
+    )
     parser.add_argument(
         "--source",
         dest="source",
@@ -73,14 +95,110 @@ def get_parser(arguments: list[str]) -> Options:
         action="store_true",
         help="Show the output without writing to the file",
     )
+    parser.add_argument(
+        "--check",
+        dest="check",
+        default=False,
+        action="store_true",
+        help="Only report which files are out of date, exit with -1 if any is. Nothing is written or printed",
+    )
+    parser.add_argument(
+        "--recursive",
+        "-r",
+        dest="recursive",
+        action="store",
+        default=None,
+        metavar="ROOT",
+        help="Process every module below ROOT that contains a variables file. The module name is taken from each directory",
+    )
+    parser.add_argument(
+        "--changed-since",
+        dest="changed_since",
+        action="store",
+        default=None,
+        metavar="REF",
+        help="Only process the modules below ROOT or PATHS (default: current directory) whose variables file or README changed since the merge base with REF, according to git",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        dest="jobs",
+        action="store",
+        type=int,
+        default=None,
+        help="Number of worker processes used together with --recursive (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        default=False,
+        action="store_true",
+        help="Do not use the result cache, always parse and render every module",
+    )
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        default=False,
+        action="store_true",
+        help="Keep running and regenerate the documentation of the modules in PATHS whenever their files change",
+    )
+    parser.add_argument(
+        "--timings",
+        dest="timings",
+        default=False,
+        action="store_true",
+        help="Print the time spent in each phase (parse, format, source, readme, write) to stderr",
+    )
+    parser.add_argument(
+        "--timings-format",
+        dest="timings_format",
+        action="store",
+        choices=["text", "json"],
+        default="text",
+        help="Output format of --timings (default: text)",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store",
+        default=None,
+        metavar="FILE",
+        help="Run under cProfile and write the stats to FILE. Modules are processed in-process",
+    )
+    parser.add_argument(
+        "--emit-index",
+        dest="emit_index",
+        action="store",
+        default=None,
+        metavar="FILE",
+        help="Also write the parsed variables of every processed module to FILE as JSON, one line per module",
+    )
+    parser.add_argument(
+        "--stdio",
+        dest="stdio",
+        default=False,
+        action="store_true",
+        help="Used with 'tfdocs serve': speak JSON-RPC (LSP base protocol) over stdin and stdout",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[],
+        metavar="PATHS",
+        help="Module directories, or directories containing modules (default: current directory)",
+    )
     parser.add_argument(
         "--version",
         action="store_true",
     )
 
+    serve = arguments[:1] == ["serve"]
+    if serve:
+        arguments = arguments[1:]
+
     parser.parse_args(arguments)
 
-    options = Options(**vars(parser.parse_args(arguments)))
+    options = Options(**vars(parser.parse_args(arguments)), serve=serve)
     return options
 
 
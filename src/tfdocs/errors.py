@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+
+class TfdocsError(Exception):
+    """Base class for errors raised by tfdocs."""
+
+
+class VariablesFileNotFoundError(TfdocsError, FileNotFoundError):
+    """The variables file of a module does not exist."""
+
+
+class ModuleFileError(TfdocsError):
+    """A .tf file of a module scanned with --all-files cannot be read."""
+
+
+class GitError(TfdocsError):
+    """A git command tfdocs depends on failed."""
@@ -0,0 +1,122 @@
+"""
+Resolve the repository root and origin URL of a module by reading the .git
+directory directly, without spawning git. Results are memoized per process.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+from typing import Optional, Tuple
+
+_SECTION_RE = re.compile(r'^\[\s*([^\s\]"]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+_KEY_RE = re.compile(r"^([A-Za-z][-A-Za-z0-9]*)\s*(?:=\s*(.*))?$")
+
+
+@functools.lru_cache(maxsize=None)
+def find_repo(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Walk up from ``path`` and return ``(work_tree, git_dir)`` for the first
+    directory containing a .git directory or a ``gitdir:`` file (worktrees,
+    submodules). Returns None outside of a repository.
+    """
+    current = os.path.abspath(path)
+
+    while True:
+        dot_git = os.path.join(current, ".git")
+
+        if os.path.isdir(dot_git):
+            return current, dot_git
+
+        if os.path.isfile(dot_git):
+            git_dir = _read_gitdir_file(dot_git)
+            if git_dir:
+                return current, git_dir
+
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _read_gitdir_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as file:
+            content = file.read().strip()
+    except OSError:
+        return None
+
+    if not content.startswith("gitdir:"):
+        return None
+
+    git_dir = content[len("gitdir:") :].strip()
+    return os.path.normpath(os.path.join(os.path.dirname(path), git_dir))
+
+
+def _common_dir(git_dir: str) -> str:
+    """Linked worktrees keep their config in the main repository's git dir."""
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r") as file:
+            common = file.read().strip()
+    except OSError:
+        return git_dir
+    return os.path.normpath(os.path.join(git_dir, common))
+
+
+@functools.lru_cache(maxsize=None)
+def origin_url(git_dir: str) -> Optional[str]:
+    """
+    Read ``remote.origin.url`` from the repository config. Returns None when
+    it is not set there (e.g. it comes from an included file).
+    """
+    try:
+        with open(os.path.join(_common_dir(git_dir), "config"), "r") as file:
+            lines = file.readlines()
+    except OSError:
+        return None
+
+    in_origin = False
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line or line[0] in "#;":
+            continue
+
+        section = _SECTION_RE.match(line)
+        if section:
+            in_origin = (
+                section.group(1).lower() == "remote" and section.group(2) == "origin"
+            )
+            line = line[section.end() :].strip()
+            if not line:
+                continue
+
+        key = _KEY_RE.match(line)
+        if in_origin and key and key.group(1).lower() == "url" and key.group(2):
+            return _config_value(key.group(2))
+
+    return None
+
+
+def _config_value(value: str) -> str:
+    result = []
+    in_quotes = False
+    chars = iter(value.strip())
+
+    for ch in chars:
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == "\\":
+            result.append(next(chars, ""))
+        elif ch in "#;" and not in_quotes:
+            break
+        else:
+            result.append(ch)
+
+    return "".join(result).strip()
+
+
+def clear_cache() -> None:
+    """Forget memoized lookups, for long-running processes."""
+    find_repo.cache_clear()
+    origin_url.cache_clear()
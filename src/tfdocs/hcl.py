@@ -0,0 +1,399 @@
+"""
+Expression tree for ``type`` and ``default`` attribute values.
+
+parse_expression() tokenizes an expression once and builds a small tree of
+maps, lists, function calls and literals; render() prints that tree. This is
+the only formatter, utils.format_block() and friends delegate to it. Spans
+whose brackets do not pair up are classified by their first and last
+characters and split by scanning them, like the original format_block()
+did, so malformed values keep their historical layout. Neither step
+recurses: both keep their pending work on an explicit stack, so any nesting
+depth can be formatted.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import partial
+from typing import Callable, Dict, Generator, List, Optional, Tuple, Union
+
+_PAIRS = {"{": "}", "[": "]", "(": ")"}
+_SCAN_RE = re.compile(r'["{}\[\](),]')
+_CALL_RE = re.compile(r"\w+\(")
+
+
+class Node:
+    __slots__ = ()
+
+
+class Literal(Node):
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class Map(Node):
+    __slots__ = ("keys", "values", "empty")
+
+    def __init__(self, keys: List[str], empty: bool) -> None:
+        self.keys = keys
+        self.values: List[Optional[Node]] = [None] * len(keys)
+        self.empty = empty
+
+
+class ListNode(Node):
+    __slots__ = ("items",)
+
+    def __init__(self, size: int) -> None:
+        self.items: List[Optional[Node]] = [None] * size
+
+
+class Call(Node):
+    __slots__ = ("name", "body", "body_inline", "args", "single_call_arg")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.body: Optional[Node] = None
+        self.body_inline = False
+        self.args: List[Optional[Node]] = []
+        self.single_call_arg = False
+
+
+class _Index:
+    """Matching close offset and top-level comma offsets of every bracket."""
+
+    __slots__ = ("close", "commas")
+
+    def __init__(self) -> None:
+        self.close: Dict[int, int] = {}
+        self.commas: Dict[int, List[int]] = {}
+
+    def pairs(self, open_pos: int, close_pos: int) -> bool:
+        return self.close.get(open_pos) == close_pos
+
+    def split(self, text: str, start: int, end: int, open_pos: int) -> List[Tuple[int, int]]:
+        return _split(text, start, end, self.commas[open_pos])
+
+
+class _Unindexed:
+    """
+    Stands in for _Index inside spans whose brackets do not pair up: every
+    bracket is taken at face value and parts are found by scanning.
+    """
+
+    __slots__ = ()
+
+    def pairs(self, open_pos: int, close_pos: int) -> bool:
+        return True
+
+    def split(self, text: str, start: int, end: int, open_pos: int) -> List[Tuple[int, int]]:
+        return split_spans(text, start, end)
+
+
+_UNINDEXED = _Unindexed()
+
+
+def _scan(text: str) -> Optional[_Index]:
+    """
+    Single pass over ``text``. Strings follow split_spans(): a quote toggles
+    unless it directly follows a backslash. Returns None when the brackets
+    do not pair up, in which case the whole expression is unindexed.
+    """
+    index = _Index()
+    stack: List[Tuple[str, int]] = []
+    in_string = False
+
+    for match in _SCAN_RE.finditer(text):
+        ch = match.group()
+        pos = match.start()
+
+        if ch == '"':
+            if pos == 0 or text[pos - 1] != "\\":
+                in_string = not in_string
+            continue
+        if in_string:
+            continue
+
+        if ch in _PAIRS:
+            stack.append((ch, pos))
+            index.commas[pos] = []
+        elif ch == ",":
+            if stack:
+                index.commas[stack[-1][1]].append(pos)
+        else:
+            if not stack or _PAIRS[stack[-1][0]] != ch:
+                return None
+            index.close[stack.pop()[1]] = pos
+
+    if stack or in_string:
+        return None
+    return index
+
+
+def _strip(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _split(text: str, start: int, end: int, commas: List[int]) -> List[Tuple[int, int]]:
+    """Stripped part spans between ``commas``, dropping an empty last part like split_spans()."""
+    bounds = [start - 1] + commas + [end]
+    parts = [_strip(text, a + 1, b) for a, b in zip(bounds, bounds[1:])]
+    if parts and parts[-1][0] == parts[-1][1]:
+        parts.pop()
+    return parts
+
+
+def split_spans(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """
+    Stripped spans of the top-level comma separated parts of text[start:end],
+    found by scanning it. Quotes toggle strings unless escaped; an empty last
+    part is dropped.
+    """
+    spans = []
+    part = start
+    depth = 0
+    in_string = False
+
+    for match in _SCAN_RE.finditer(text, start, end):
+        ch = match.group()
+        pos = match.start()
+        if ch == '"':
+            if pos == part or text[pos - 1] != "\\":
+                in_string = not in_string
+        elif in_string:
+            continue
+        elif ch in _PAIRS:
+            depth += 1
+        elif ch != ",":
+            depth -= 1
+        elif depth == 0:
+            spans.append(_strip(text, part, pos))
+            part = pos + 1
+
+    last = _strip(text, part, end)
+    if last[0] < last[1]:
+        spans.append(last)
+    return spans
+
+
+_AnyIndex = Union[_Index, _Unindexed]
+_Task = Tuple[Callable[[Node], None], int, int, _AnyIndex]
+
+
+def _classify(
+    text: str, start: int, end: int, index: _AnyIndex, tasks: List[_Task]
+) -> Node:
+    """Build the node for the stripped span and queue its children on ``tasks``."""
+    if start == end:
+        return Literal("")
+
+    first, last = text[start], text[end - 1]
+
+    if first == "{" and last == "}":
+        if not index.pairs(start, end - 1):
+            return _classify(text, start, end, _UNINDEXED, tasks)
+
+        keys: List[str] = []
+        values: List[Tuple[int, int]] = []
+        for part_start, part_end in index.split(text, start + 1, end - 1, start):
+            eq = text.find("=", part_start, part_end)
+            if eq != -1:
+                keys.append(text[part_start:eq].strip())
+                values.append((eq + 1, part_end))
+
+        inner_start, inner_end = _strip(text, start + 1, end - 1)
+        node = Map(keys, empty=inner_start == inner_end)
+        for i, (value_start, value_end) in enumerate(values):
+            tasks.append(
+                (partial(node.values.__setitem__, i), value_start, value_end, index)
+            )
+        return node
+
+    if first == "[" and last == "]":
+        if not index.pairs(start, end - 1):
+            return _classify(text, start, end, _UNINDEXED, tasks)
+
+        parts = index.split(text, start + 1, end - 1, start)
+        node = ListNode(len(parts))
+        for i, (part_start, part_end) in enumerate(parts):
+            tasks.append((partial(node.items.__setitem__, i), part_start, part_end, index))
+        return node
+
+    if last == ")":
+        match = _CALL_RE.match(text, start, end)
+        if not match:
+            return Literal(text[start:end])
+
+        paren = match.end() - 1
+        if not index.pairs(paren, end - 1):
+            return _classify(text, start, end, _UNINDEXED, tasks)
+
+        node = Call(text[start:paren])
+        inner_start, inner_end = _strip(text, paren + 1, end - 1)
+
+        if inner_start < inner_end and (
+            (text[inner_start] == "{" and text[inner_end - 1] == "}")
+            or (text[inner_start] == "[" and text[inner_end - 1] == "]")
+        ):
+            node.body_inline = text[inner_start] == "{"
+            tasks.append((partial(setattr, node, "body"), inner_start, inner_end, index))
+            return node
+
+        parts = index.split(text, inner_start, inner_end, paren)
+        node.args = [None] * len(parts)
+        for i, (part_start, part_end) in enumerate(parts):
+            tasks.append((partial(node.args.__setitem__, i), part_start, part_end, index))
+
+        if len(parts) == 1:
+            part_start, part_end = parts[0]
+            node.single_call_arg = (
+                text[part_end - 1] == ")"
+                and _CALL_RE.match(text, part_start, part_end) is not None
+                and text.find("\n", part_start, part_end) == -1
+            )
+        return node
+
+    return Literal(text[start:end])
+
+
+def parse_expression(text: str) -> Node:
+    """Parse an HCL type or default expression into a tree in a single pass."""
+    index: _AnyIndex = _scan(text) or _UNINDEXED
+
+    result: List[Node] = []
+    tasks: List[_Task] = [(result.append, 0, len(text), index)]
+
+    while tasks:
+        sink, start, end, span_index = tasks.pop()
+        start, end = _strip(text, start, end)
+        sink(_classify(text, start, end, span_index, tasks))
+
+    return result[0]
+
+
+def render(node: Node, indent_level: int = 0, inline: bool = False) -> str:
+    """Print ``node`` with ``indent_level`` levels of indentation."""
+    return run_frames(_render_frame(node, indent_level, inline))
+
+
+# A frame formats one level of an expression: it yields the frames of the
+# parts it needs, is sent back their output and returns its own. Parts that
+# need no frame (literals) are plain strings and are used directly.
+# run_frames() keeps the frames on a list, so nesting depth is not limited
+# by the interpreter's recursion limit.
+Frame = Generator["Frame", str, str]
+
+
+def run_frames(frame: Union[Frame, str]) -> str:
+    """Run ``frame`` and every frame it yields; returns its output."""
+    if isinstance(frame, str):
+        return frame
+
+    stack: List[Frame] = [frame]
+    value: Optional[str] = None
+
+    while True:
+        try:
+            stack.append(stack[-1].send(value))  # type: ignore[arg-type]
+            value = None
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            value = stop.value
+
+
+def _render_frame(node: Node, indent_level: int, inline: bool) -> Union[Frame, str]:
+    if isinstance(node, Literal):
+        return "  " * indent_level + node.text
+    if isinstance(node, Map):
+        return _render_map(node, indent_level, inline)
+    if isinstance(node, ListNode):
+        return _render_list(node, indent_level)
+    return _render_call(node, indent_level, inline)  # type: ignore[arg-type]
+
+
+def _render_map(node: Map, indent_level: int, inline: bool) -> Frame:
+    if inline and node.empty:
+        return "{}"
+
+    if inline:
+        body_indent = "  " * (indent_level + 2)
+        closing_indent = "  " * (indent_level + 1)
+    else:
+        body_indent = "  " * (indent_level + 1)
+        closing_indent = "  " * indent_level
+
+    lines = []
+    for i, (key, value) in enumerate(zip(node.keys, node.values)):
+        child = _render_frame(value, indent_level + 1, True)
+        formatted_val = (child if isinstance(child, str) else (yield child)).strip()
+        comma = "," if i < len(node.keys) - 1 else ""
+        lines.append(f"{body_indent}{key} = {formatted_val}{comma}")
+
+    return "{\n" + "\n".join(lines) + f"\n{closing_indent}}}"
+
+
+def _render_list(node: ListNode, indent_level: int) -> Frame:
+    opening_indent = "  " * indent_level
+    closing_indent = "  " * (indent_level + 1)
+
+    if not node.items:
+        return f"{opening_indent}[]"
+
+    rendered_items = []
+    for i, item in enumerate(node.items):
+        child = _render_frame(item, indent_level + 1, False)
+        formatted = child if isinstance(child, str) else (yield child)
+        item_block = _indent_list_item(formatted.rstrip().splitlines(), indent_level)
+        comma = "," if (len(node.items) > 1 and i < len(node.items) - 1) else ""
+        rendered_items.append(item_block + comma)
+
+    return f"{opening_indent}[\n" + "\n".join(rendered_items) + f"\n{closing_indent}]"
+
+
+def _indent_list_item(lines: List[str], indent_level: int) -> str:
+    """Re-indent the formatted lines of a list item."""
+    if len(lines) > 1:
+        adjusted = []
+        for idx, line in enumerate(lines):
+            if idx == 0 or idx == len(lines) - 1:
+                target = indent_level + 2
+            else:
+                target = indent_level + 3
+            adjusted.append(("  " * target) + line.strip())
+        return "\n".join(adjusted)
+
+    return ("  " * (indent_level + 2)) + lines[0].strip()
+
+
+def _render_call(node: Call, indent_level: int, inline: bool) -> Frame:
+    if node.body is not None:
+        if node.body_inline:
+            adjusted_level = indent_level - 1 if inline else indent_level
+            child = _render_frame(node.body, max(adjusted_level, 0), True)
+        else:
+            child = _render_frame(node.body, indent_level, False)
+        formatted = child if isinstance(child, str) else (yield child)
+        return f"{node.name}({formatted.strip()})"
+
+    if inline and node.single_call_arg:
+        children = [_render_frame(node.args[0], max(indent_level - 1, 0), True)]
+    else:
+        children = [_render_frame(arg, indent_level + 1, False) for arg in node.args]
+
+    formatted_parts = []
+    for child in children:
+        formatted = child if isinstance(child, str) else (yield child)
+        formatted_parts.append(formatted.strip())
+
+    return f"{node.name}({', '.join(formatted_parts)})"
+
+
+def format_expression(text: str, indent_level: int = 0, inline: bool = False) -> str:
+    return render(parse_expression(text), indent_level, inline)
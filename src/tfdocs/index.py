@@ -0,0 +1,104 @@
+"""
+``--emit-index``: the parsed variables of one or many modules as JSON, for
+tools that would otherwise parse variables.tf themselves.
+
+The index holds one JSON object per line (NDJSON), one line per module, so
+a single-module index is also a plain JSON document. It is written while
+the modules are scanned and never held in memory as a whole. Each line
+looks like::
+
+    {"version": 1, "module": "network", "path": "modules/network",
+     "variables": [{"name": "cidr", "type": "string", "type_override": null,
+                    "description": "\\"VPC range\\"", "default": null,
+                    "file": "variables.tf", "span": [0, 64]}]}
+
+Values are the HCL source text as tfdocs parses it; descriptions keep their
+quotes and a missing ``default`` is null. Variables are listed per file in
+file order; ``span`` is the ``[start, end)`` byte range of the block, from
+the ``variable`` keyword to its closing brace. New keys may be added within
+a version, removing or changing one bumps SCHEMA_VERSION.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from tfdocs import reader
+from tfdocs.cli import Options
+from tfdocs.errors import VariablesFileNotFoundError
+from tfdocs.readme import other_tf_files, parse_block
+from tfdocs.utils import atomic_write
+
+SCHEMA_VERSION = 1
+
+_TRAILING = b" \t\r"
+
+
+def file_variables(path: str, module_dir: str) -> Iterator[Dict[str, Any]]:
+    """The index entries of the variable blocks in the .tf file ``path``."""
+    file_name = os.path.relpath(path, module_dir)
+
+    with reader.open_variables(path) as buf:
+        if buf.find(b"variable") == -1:
+            return
+
+        for block in reader.iter_variable_blocks(buf):
+            item, _ = parse_block(block.name, reader.block_lines(buf, block))
+            end = block.end
+            while end > block.start and buf[end - 1] in _TRAILING:
+                end -= 1
+            yield {
+                "name": item.name,
+                "type": item.type,
+                "type_override": item.type_override,
+                "description": item.description,
+                "default": item.default,
+                "file": file_name,
+                "span": [reader.header_start(buf, block), end],
+            }
+
+
+def module_record(
+    module_dir: str, options: Options, module_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """The index line of the module in ``module_dir``."""
+    variables_file = os.path.join(module_dir, options.variables_file)
+    if not os.path.isfile(variables_file):
+        raise VariablesFileNotFoundError(f"Cannot find {variables_file}")
+
+    files = [variables_file]
+    if options.all_files:
+        files.extend(other_tf_files(variables_file))
+
+    variables: List[Dict[str, Any]] = []
+    for path in files:
+        variables.extend(file_variables(path, module_dir))
+
+    return {
+        "version": SCHEMA_VERSION,
+        "module": module_name or os.path.basename(os.path.abspath(module_dir)),
+        "path": module_dir,
+        "variables": variables,
+    }
+
+
+def write_records(path: str, records: Iterable[Dict[str, Any]]) -> None:
+    """Write the index lines ``records`` to ``path`` as they are produced."""
+    atomic_write(path, (json.dumps(record).encode("utf-8") + b"\n" for record in records))
+
+
+def write_index(
+    path: str,
+    module_dirs: Iterable[str],
+    options: Options,
+    module_name: Optional[str] = None,
+) -> None:
+    """
+    Write the index of ``module_dirs`` to ``path``, one module at a time.
+    ``module_name`` overrides the directory names (single-module runs).
+    """
+    write_records(
+        path, (module_record(module_dir, options, module_name) for module_dir in module_dirs)
+    )
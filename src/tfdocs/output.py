@@ -0,0 +1,33 @@
+"""
+Console output. rich is only imported when writing to a terminal; pipes,
+CI logs and pre-commit hooks get plain text without paying for the import.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from typing import Any, Optional
+
+# Only the tags tfdocs writes itself, so paths and error messages holding
+# brackets (modules/list[a]) are printed as they are.
+_MARKUP_RE = re.compile(r"\[/?(?:red|green|yellow|cyan|purple)\]|\[/\]")
+
+_console: Optional[Any] = None
+
+
+def get_console() -> Any:
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+def echo(message: str) -> None:
+    """Print a message containing rich markup such as ``[green]...[/]``."""
+    if sys.stdout.isatty():
+        get_console().print(message)
+    else:
+        print(_MARKUP_RE.sub("", message))
@@ -0,0 +1,131 @@
+"""
+Memory-mapped, bytes-level reader for variables files.
+
+Variable block boundaries are found as byte offsets on the mapped file, and
+only the blocks themselves are decoded, so peak memory stays close to the
+file size. CRLF line endings and a UTF-8 BOM are handled in place.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional, Union
+
+from tfdocs.utils import BlockCounter
+
+Buffer = Union[bytes, mmap.mmap]
+
+BOM = b"\xef\xbb\xbf"
+_WHITESPACE = b" \t\n\r\x0b\x0c"
+_VAR_HEADER_RE = re.compile(rb'\s*variable\s+"?(\w+)"?\s*{\s*', re.DOTALL)
+
+
+class VariableBlock(NamedTuple):
+    name: str
+    start: int
+    end: int
+
+
+@contextmanager
+def open_mapped(path: str) -> Iterator[Buffer]:
+    """Map ``path`` read-only. Empty files cannot be mapped and yield b""."""
+    with open(path, "rb") as file:
+        try:
+            buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+open_variables = open_mapped
+
+
+def _content_start(buf: Buffer) -> int:
+    return len(BOM) if buf[: len(BOM)] == BOM else 0
+
+
+def iter_variable_blocks(
+    buf: Buffer, start: Optional[int] = None
+) -> Iterator[VariableBlock]:
+    """
+    Yield the byte span of every ``variable`` block. A span starts at the
+    line of its ``variable`` header. Other lines are skipped without being
+    bracket counted, so resources, locals and expressions like ``k => v``
+    in other .tf files cannot hide the blocks after them. ``start``
+    resumes the scan at the end of a previously yielded block.
+    """
+    pos = _content_start(buf) if start is None else start
+    size = len(buf)
+    counter = BlockCounter()
+    name = None
+    block_start = pos
+
+    while pos < size:
+        newline = buf.find(b"\n", pos)
+        line_end = size if newline == -1 else newline
+        line = buf[pos:line_end]
+
+        if name is None:
+            match = _VAR_HEADER_RE.match(line)
+            if match is None:
+                pos = line_end + 1
+                continue
+            name = match.group(1).decode()
+            block_start = pos
+            counter.reset()
+
+        if counter.feed(line):
+            yield VariableBlock(name, block_start, line_end)
+            name = None
+
+        pos = line_end + 1
+
+
+def header_start(buf: Buffer, block: VariableBlock) -> int:
+    """
+    Offset of the ``variable`` keyword of ``block``, skipping the lines
+    between the previous block and this one.
+    """
+    pos = block.start
+    while pos < block.end:
+        newline = buf.find(b"\n", pos, block.end)
+        line_end = block.end if newline == -1 else newline
+        line = buf[pos:line_end]
+        if _VAR_HEADER_RE.match(line):
+            return pos + len(line) - len(line.lstrip())
+        pos = line_end + 1
+    return block.start
+
+
+def block_lines(buf: Buffer, block: VariableBlock) -> List[str]:
+    text = buf[block.start : block.end].decode("utf-8")
+    return text.replace("\r\n", "\n").split("\n")
+
+
+def content_equals(buf: Buffer, text: str) -> bool:
+    """``buf`` decoded and stripped equals ``text.strip()``, compared in place."""
+    start = _content_start(buf)
+    end = len(buf)
+    while start < end and buf[start] in _WHITESPACE:
+        start += 1
+    while end > start and buf[end - 1] in _WHITESPACE:
+        end -= 1
+
+    expected = text.strip().encode("utf-8")
+
+    if buf.find(b"\r", start, end) != -1:
+        return buf[start:end].replace(b"\r\n", b"\n") == expected
+
+    if end - start != len(expected):
+        return False
+
+    with memoryview(buf) as view:
+        with view[start:end] as region:
+            return region == expected
@@ -1,29 +1,269 @@
+import contextlib
+import glob
 import os
 import re
 import sys
-from typing import List, Dict, Optional, TypedDict
-
-from rich.console import Console
-
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from tfdocs import reader, splice
+from tfdocs.timings import timed
+from tfdocs.errors import ModuleFileError, VariablesFileNotFoundError
+from tfdocs.output import echo, get_console
 from tfdocs.utils import (
-    count_blocks,
+    BlockCounter,
+    atomic_write,
     construct_tf_file,
     generate_source,
-    process_line_block,
 )
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
 
-class VariableItem(TypedDict, total=False):
-    name: str
-    type_override: Optional[str]
-    type: str
-    description: str
-    default: str
+# READMEs up to this size are read into memory on a background thread while
+# the variables are parsed; larger ones are mapped when they are needed.
+PRELOAD_SIZE = 1 << 20
 
+_executor: "Optional[ThreadPoolExecutor]" = None
 
-class Readme:
-    _re_var_header = re.compile(r'\s*variable\s+"?(\w+)"?\s*{\s*', re.DOTALL)
 
+def _background() -> "ThreadPoolExecutor":
+    """The thread pool shared by all Readme instances, started on first use."""
+    global _executor
+    if _executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tfdocs")
+    return _executor
+
+
+def _forget_executor() -> None:
+    # A forked worker process inherits the pool but none of its threads.
+    global _executor
+    _executor = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_executor)
+
+
+class Variable(Mapping):
+    """
+    A parsed variable block. Stored in slots with interned type strings, but
+    reads like the dict it replaces: ``item["type"]``, ``item.get("default")``,
+    ``"default" in item`` and ``item == {...}`` all work. ``default`` is only
+    a key when the block has one.
+    """
+
+    __slots__ = ("name", "type_override", "type", "description", "default")
+
+    def __init__(
+        self,
+        name: str,
+        type_override: Optional[str],
+        type: str,
+        description: str,
+        default: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.type_override = None if type_override is None else sys.intern(type_override)
+        self.type = sys.intern(type)
+        self.description = description
+        self.default = default
+
+    def __getitem__(self, key: str) -> Optional[str]:
+        if key in _VARIABLE_KEYS and (key != "default" or self.default is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    # Mapping implements these on top of __getitem__ and KeyError; going
+    # straight to the slots keeps formatting large files fast.
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        if key in _VARIABLE_KEYS:
+            value = getattr(self, key)
+            if value is not None or key != "default":
+                return value
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in _VARIABLE_KEYS and (key != "default" or self.default is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_VARIABLE_KEYS if self.default is not None else _VARIABLE_KEYS[:-1])
+
+    def __len__(self) -> int:
+        return 4 if self.default is None else 5
+
+    def __repr__(self) -> str:
+        return f"Variable({dict(self)!r})"
+
+
+_VARIABLE_KEYS = Variable.__slots__
+
+# Kept for callers annotating with the old dict type.
+VariableItem = Variable
+
+
+class VariablesView(Sequence):
+    """
+    ``items`` in name order, stored as an array of indexes into ``items``
+    instead of a second list. Sorting is stable, like sorted().
+    """
+
+    __slots__ = ("_items", "_order")
+
+    def __init__(self, items: List[Variable]) -> None:
+        self._items = items
+        self._order = array(
+            "I", sorted(range(len(items)), key=lambda i: items[i].name)
+        )
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._items[i] for i in self._order[index]]
+        return self._items[self._order[index]]
+
+    def __iter__(self) -> Iterator[Variable]:
+        return map(self._items.__getitem__, self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"VariablesView({list(self)!r})"
+
+
+# The attributes parse_block() extracts, in the order the line based parser
+# used to probe them. One alternation classifies a line; lastindex is the
+# position of the attribute in _ATTRIBUTES.
+_ATTRIBUTES = ("type", "type_override", "default", "description")
+_ATTRIBUTE_RE = re.compile(
+    r"\s*(?:(type)|(#\s*tfdocs:\s*type)|(default)|(description))\s*=\s*"
+)
+
+
+def parse_block(name: str, block: List[str]) -> Tuple[Variable, int]:
+    """
+    Extract the attributes of one variable block. Also returns the width of
+    its ``  name = <type>`` README column.
+
+    Same results as calling process_line_block() for every attribute on every
+    line, but each line is classified with a single regex match and a value
+    spanning several lines is bracket-counted incrementally.
+    """
+    str_len = 0
+    values: List[Optional[str]] = ["", None, "", ""]
+    cont: Optional[int] = None
+    counter = BlockCounter()
+
+    for line_block in block:
+        first = 0
+        type_changed = False
+
+        if cont is not None:
+            piece = line_block.strip()
+            values[cont] += piece  # type: ignore[operator]
+            type_changed = cont < 2
+            if counter.feed(piece):
+                # Attributes probed after the finished one still get a look
+                # at this line.
+                first, cont = cont + 1, None
+
+        if cont is None:
+            match = _ATTRIBUTE_RE.match(line_block)
+            if match and match.lastindex > first:
+                cont = match.lastindex - 1
+                value = line_block[match.end() :].strip()
+                values[cont] = value
+                type_changed = type_changed or cont < 2
+                counter.reset()
+                if counter.feed(value):
+                    cont = None
+
+        if type_changed and name:
+            type_len_content = values[1] if values[1] else values[0]
+            if type_len_content:
+                str_len = max(str_len, len(f"  {name} = <{type_len_content}>"))
+
+    type_content, type_override, default_content, description_content = values
+
+    attributes = Variable(
+        name or "",
+        type_override,
+        type_content if type_content else "unknown",
+        description_content if description_content else '"No description provided"',
+        default_content if default_content else None,
+    )
+
+    return attributes, str_len
+
+
+def other_tf_files(variables_file: str) -> List[str]:
+    """The *.tf files next to ``variables_file``, in name order."""
+    variables_path = os.path.abspath(variables_file)
+    directory = os.path.dirname(variables_path)
+    return [
+        path
+        for path in sorted(glob.glob(os.path.join(glob.escape(directory), "*.tf")))
+        if path != variables_path
+    ]
+
+
+def scan_variables(buf: reader.Buffer) -> Tuple[List[Variable], int]:
+    """
+    Parse every variable block of the contents of a .tf file. Files without
+    the word ``variable`` are rejected after a single find().
+    """
+    items: List[Variable] = []
+    str_len = 0
+
+    if buf.find(b"variable") == -1:
+        return items, str_len
+
+    for block in reader.iter_variable_blocks(buf):
+        attributes, block_len = parse_block(block.name, reader.block_lines(buf, block))
+        items.append(attributes)
+        str_len = max(str_len, block_len)
+
+    return items, str_len
+
+
+def scan_variables_file(path: str) -> Tuple[List[Variable], int]:
+    """scan_variables() of the mapped file ``path``."""
+    with reader.open_variables(path) as buf:
+        return scan_variables(buf)
+
+
+class Readme:
+    """
+    One module's documentation, produced in stages:
+
+    parse   __init__ reads the variables file into Variable records. The
+            module source and the README are loaded on background threads
+            meanwhile.
+    render  variables_text() and _render_section() build the formatted
+            variables file and the generated README section.
+    diff    variables_changed / readme_changed tell whether they differ from
+            the files on disk (see get_status()). Only the bytes between
+            the README markers are compared.
+    emit    print_*() and write_*() output them. The README is spliced
+            together from the file on disk and the section as it is
+            written (see tfdocs.splice).
+
+    Rendered text is computed on first use and cached, so every entry point
+    shares one render. reload_readme() forgets the README diff after the
+    file changed on disk; the generated section is kept.
+    """
+
+    @timed("parse")
     def __init__(
         self,
         readme_file: str,
@@ -31,123 +271,174 @@ class Readme:
         module_name: Optional[str] = None,
         module_source: Optional[str] = None,
         module_source_git: bool = False,
+        module_path: Optional[str] = None,
+        scan_module: bool = False,
     ) -> None:
         self.module_name: Optional[str] = module_name
         self.module_source: Optional[str] = module_source
         self.module_source_git: bool = module_source_git
-        self.readme_content: str  # populated lazily via construct_readme()
+        self.module_path: Optional[str] = module_path
         self.readme_changed: bool = True
         self.variables_changed: bool = True
         self.readme_file: str = readme_file
         self.variables_file: str = variables_file
         self.str_len: int = 0
-        self.console = Console()
-        self.variables: List[VariableItem] = []
+        self.variables: List[Variable] = []
+        self._variables_text: Optional[str] = None
+        self._section: Optional[bytes] = None
+        self._readme_diffed: bool = False
+        self._readme_lines: Optional[List[str]] = None
+        self._readme_text: Optional[str] = None
+
+        self.module_variables: Sequence[Variable]
+
+        # The source lookup (possibly spawning git) and the README read do not
+        # depend on the variables, so they run while those are parsed and are
+        # only waited for when the README is rendered.
+        pool = _background()
+        self._source: "Future[str]" = pool.submit(self._resolve_source)
+        self._preloaded: "Optional[Future[Optional[bytes]]]" = pool.submit(
+            self._load_readme
+        )
 
-        try:
-            with open(self.variables_file, "r") as file:
-                file_content = file.read().strip()
-
-            block: List[str] = []
-            match_flag = False
-            name: Optional[str] = None
-
-            for line in file_content.split("\n"):
-                block.append(line)
-                match = self._re_var_header.match(line)
-                if match and not match_flag:
-                    name = match.group(1)
-                    match_flag = True
-
-                if count_blocks(block) and match_flag:
-                    match_flag = False
-                    (
-                        type_content,
-                        default_content,
-                        description_content,
-                        type_override,
-                        cont,
-                    ) = ("", "", "", None, None)
-
-                    for line_block in block:
-                        type_content, cont = process_line_block(
-                            line_block, "type", type_content, cont
-                        )
-
-                        type_override, cont = process_line_block(
-                            line_block, "type_override", type_override, cont
-                        )
-
-                        type_len_content = (
-                            type_override if type_override else type_content
-                        )
-                        if name and type_len_content:
-                            candidate_len = len(f"  {name} = <{type_len_content}>")
-                            if candidate_len > self.str_len:
-                                self.str_len = candidate_len
-
-                        default_content, cont = process_line_block(
-                            line_block, "default", default_content, cont
-                        )
-                        description_content, cont = process_line_block(
-                            line_block, "description", description_content, cont
-                        )
-
-                    block = []
-                    attributes: VariableItem = {
-                        "name": name or "",
-                        "type_override": type_override,
-                        "type": type_content if type_content else "unknown",
-                        "description": description_content
-                        if description_content
-                        else '"No description provided"',
-                    }
-
-                    if default_content:
-                        attributes["default"] = default_content
+        pending = None
+        if scan_module:
+            other_files = self._other_tf_files()
+            if other_files:
+                pending = pool.map(self._scan_other_file, other_files)
 
+        try:
+            with self._open_variables() as buf:
+                for attributes, str_len in self._parse_variables(buf):
                     self.variables.append(attributes)
+                    self.str_len = max(self.str_len, str_len)
+
+                self.sorted_variables: Sequence[Variable] = VariablesView(self.variables)
+
+                if reader.content_equals(buf, self.variables_text()):
+                    self.variables_changed = False
+
+        except FileNotFoundError as exc:
+            raise VariablesFileNotFoundError(
+                f"Cannot find {self.variables_file} in current directory"
+            ) from exc
+
+        self.module_variables = self.sorted_variables
+        if pending is not None:
+            other_variables: List[Variable] = []
+            for items, str_len in pending:
+                other_variables.extend(items)
+                self.str_len = max(self.str_len, str_len)
+
+            if other_variables:
+                self.module_variables = VariablesView(self.variables + other_variables)
+
+    def _open_variables(self) -> ContextManager[reader.Buffer]:
+        return reader.open_variables(self.variables_file)
+
+    def _parse_variables(self, buf: reader.Buffer) -> Iterator[Tuple[Variable, int]]:
+        for block in reader.iter_variable_blocks(buf):
+            yield parse_block(block.name, reader.block_lines(buf, block))
+
+    def _open_readme(self) -> ContextManager[Optional[reader.Buffer]]:
+        if not os.path.exists(self.readme_file):
+            return contextlib.nullcontext(None)
+        return reader.open_mapped(self.readme_file)
+
+    def _resolve_source(self) -> str:
+        return generate_source(
+            self.module_name,
+            self.module_source,
+            self.module_source_git,
+            self.module_path,
+        )
 
-            self.sorted_variables: List[VariableItem] = sorted(
-                self.variables, key=lambda k: k["name"]
-            )
+    def _load_readme(self) -> Optional[bytes]:
+        """The README contents, or None when it is missing or too large to preload."""
+        with self._open_readme() as buf:
+            if buf is None or len(buf) > PRELOAD_SIZE:
+                return None
+            return bytes(buf)
 
-            if construct_tf_file(self.sorted_variables).strip() == file_content.strip():
-                self.variables_changed = False
+    def _readme_buffer(self) -> ContextManager[Optional[reader.Buffer]]:
+        if self._preloaded is not None:
+            content = self._preloaded.result()
+            if content is not None:
+                return contextlib.nullcontext(content)
+        return self._open_readme()
 
-        except FileNotFoundError:
-            self.console.print(
-                f"[red]ERROR:[/] Cannot find {self.variables_file} in current directory"
-            )
-            sys.exit(-1)
+    def _other_tf_files(self) -> List[str]:
+        return other_tf_files(self.variables_file)
 
-    def write_variables(self) -> None:
-        with open(self.variables_file, "w") as file:
-            file.writelines(construct_tf_file(self.sorted_variables))
+    def _scan_other_file(self, path: str) -> Tuple[List[Variable], int]:
+        try:
+            return scan_variables_file(path)
+        except (OSError, UnicodeDecodeError) as exc:
+            raise ModuleFileError(f"Cannot read {path}: {exc}") from exc
+
+    @property
+    def console(self):
+        return get_console()
+
+    def variables_text(self) -> str:
+        if self._variables_text is None:
+            self._variables_text = self._render_variables()
+        return self._variables_text
+
+    @timed("format")
+    def _render_variables(self) -> str:
+        return construct_tf_file(self.sorted_variables)
+
+    @timed("write")
+    def write_variables(self) -> bool:
+        """Write the formatted variables file unless it is already formatted."""
+        if not self.variables_changed:
+            return False
+
+        atomic_write(self.variables_file, self.variables_text())
+        return True
 
     def print_variables_file(self) -> None:
-        self.console.print("[purple]--- variables.tf ---[/]")
-        print(construct_tf_file(self.sorted_variables))
+        echo("[purple]--- variables.tf ---[/]")
+        print(self.variables_text())
 
     def get_status(self) -> Dict[str, bool]:
+        self._diff_readme()
         return {
             "readme": self.readme_changed,
             "variables": self.variables_changed,
         }
 
     def construct_readme(self) -> List[str]:
+        """The README lines as readme_text() has them. A copy, callers may modify it."""
+        if self._readme_lines is None:
+            self._readme_lines = self.readme_text().split("\n")
+        return list(self._readme_lines)
+
+    def reload_readme(self) -> None:
+        """Compare and splice again on next use, re-reading the file on disk."""
+        self._readme_lines = None
+        self._readme_text = None
+        self._readme_diffed = False
+        self._preloaded = None
+        self.readme_changed = True
+
+    @timed("readme")
+    def _render_section(self) -> bytes:
+        """The generated section that goes between the markers."""
+        if self._section is not None:
+            return self._section
+
         readme_content: List[str] = [
             "```",
             f"module <{self.module_name}> {{",
-            f'  source = "{generate_source(self.module_name, self.module_source, self.module_source_git)}"',
+            f'  source = "{self._source.result()}"',
         ]
 
-        for item in self.sorted_variables:
-            type_str = (
-                item["type_override"] if item.get("type_override") else item["type"]
-            )
-            spaces = " " * (self.str_len - len(f"  {item['name']} = <{type_str}>") + 2)
-            desc_raw = item["description"]
+        for item in self.module_variables:
+            type_str = item.type_override if item.type_override else item.type
+            spaces = " " * (self.str_len - len(f"  {item.name} = <{type_str}>") + 2)
+            desc_raw = item.description
             description = (
                 desc_raw[1:-1]
                 if (desc_raw.startswith('"') or desc_raw.startswith("'"))
@@ -156,54 +447,60 @@ class Readme:
             )
 
             readme_content.append(
-                f"  {item['name']} = <{type_str.upper()}> {spaces} # {description}"
+                f"  {item.name} = <{type_str.upper()}> {spaces} # {description}"
             )
 
         readme_content.append("}")
         readme_content.append("```")
 
-        if os.path.exists(self.readme_file):
-            with open(self.readme_file, "r") as file:
-                content = file.read()
-
-            lines = content.split("\n")
-            start_index: Optional[int] = None
-            end_index: Optional[int] = None
-
-            for i, line in enumerate(lines):
-                if "<!-- TFDOCS START -->" in line:
-                    start_index = i
-                elif "<!-- TFDOCS END -->" in line:
-                    end_index = i
+        self._section = splice.section_bytes(readme_content)
+        return self._section
 
-            lines_constructed = lines[:]
-            if start_index is not None and end_index is not None:
-                del lines_constructed[start_index + 1 : end_index]
-                lines_constructed[start_index + 1 : start_index + 1] = readme_content
+    @timed("readme")
+    def _diff_readme(self) -> None:
+        if self._readme_diffed:
+            return
 
-                # Check if the README.md file has changed
-                if lines_constructed == lines:
+        section = self._render_section()
+        with self._readme_buffer() as buf:
+            if buf is not None:
+                buf = splice.normalize(buf)
+                found = splice.find_splice(buf)
+                if found is not None and splice.is_unchanged(buf, found, section):
                     self.readme_changed = False
-
-                return lines_constructed
-
-        return (
-            [f"# {self.module_name} module", "", "<!-- TFDOCS START -->"]
-            + readme_content
-            + ["<!-- TFDOCS END -->", ""]
-        )
+        self._readme_diffed = True
+
+    def _readme_chunks(self) -> Iterator[bytes]:
+        # The README is only mapped while the chunks are consumed.
+        section = self._render_section()
+        with self._readme_buffer() as buf:
+            yield from splice.iter_chunks(
+                None if buf is None else splice.normalize(buf),
+                section,
+                self.module_name,
+            )
 
     def print_readme(self) -> None:
-        self.console.print("[purple]--- README.md ---[/]")
+        echo("[purple]--- README.md ---[/]")
         for line in self.construct_readme():
             print(line)
 
-    def write_readme(self) -> bool:
-        readme_content = self.construct_readme()
-
-        if readme_content and readme_content[-1] == "":
-            readme_content.pop()
+    @timed("readme")
+    def readme_text(self) -> str:
+        """The README exactly as write_readme() writes it."""
+        if self._readme_text is None:
+            self._readme_text = b"".join(self._readme_chunks()).decode("utf-8")
+        return self._readme_text
 
-        with open(self.readme_file, "w") as file:
-            file.writelines("%s\n" % item for item in readme_content)
+    @timed("write")
+    def write_readme(self) -> bool:
+        """
+        Write the README unless it is already up to date. The parts outside
+        the markers are streamed from the current file.
+        """
+        self._diff_readme()
+        if not self.readme_changed:
+            return False
+
+        atomic_write(self.readme_file, self._readme_chunks())
         return True
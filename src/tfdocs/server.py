@@ -0,0 +1,390 @@
+"""
+``tfdocs serve --stdio``: a JSON-RPC server speaking the LSP base protocol,
+for editors that want format-on-save and live README previews without
+starting a process per request.
+
+Parsed modules are kept in memory. When a document changes, only the variable
+blocks between the first and the last edited byte are scanned and parsed
+again; the blocks before and after the edit are reused as they are.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import json
+import os
+import sys
+from typing import Any, BinaryIO, Dict, List, NamedTuple, Optional
+from urllib.parse import unquote, urlparse
+
+from tfdocs import __version__, reader, readme
+from tfdocs.api import Result
+from tfdocs.cli import Options
+from tfdocs.errors import TfdocsError
+from tfdocs.utils import construct_tf_variable
+
+_PARSE_ERROR = -32700
+_INVALID_REQUEST = -32600
+_METHOD_NOT_FOUND = -32601
+_INVALID_PARAMS = -32602
+_INTERNAL_ERROR = -32603
+_REQUEST_FAILED = -32803
+
+_TEXT_DOCUMENT_SYNC_FULL = 1
+_CHUNK = 4096
+
+
+class _Parsed(NamedTuple):
+    block: reader.VariableBlock
+    item: readme.Variable
+    str_len: int
+    text: str
+
+
+class _RequestError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    limit = min(len(a), len(b))
+    pos = 0
+    while pos < limit and a[pos : pos + _CHUNK] == b[pos : pos + _CHUNK]:
+        pos += _CHUNK
+    pos = min(pos, limit)
+    end = min(pos + _CHUNK, limit)
+    while pos < end and a[pos] == b[pos]:
+        pos += 1
+    return pos
+
+
+def _common_suffix(a: bytes, b: bytes, limit: int) -> int:
+    size = 0
+    while size < limit:
+        step = min(_CHUNK, limit - size)
+        a_end, b_end = len(a) - size, len(b) - size
+        if a[a_end - step : a_end] != b[b_end - step : b_end]:
+            break
+        size += step
+    while size < limit and a[len(a) - size - 1] == b[len(b) - size - 1]:
+        size += 1
+    return size
+
+
+class ModuleState:
+    """The last parsed contents of a variables file, one entry per block."""
+
+    def __init__(self) -> None:
+        self.content = b""
+        self.blocks: List[_Parsed] = []
+        self.parsed_blocks = 0
+
+    def update(self, content: bytes) -> List[_Parsed]:
+        old, blocks = self.content, self.blocks
+        if content == old:
+            return blocks
+
+        prefix = _common_prefix(old, content)
+        suffix = _common_suffix(old, content, min(len(old), len(content)) - prefix)
+        delta = len(content) - len(old)
+
+        # A block is unchanged when its closing newline comes before the edit.
+        keep = 0
+        while keep < len(blocks) and blocks[keep].block.end < prefix:
+            keep += 1
+
+        old_starts = {entry.block.start: i for i, entry in enumerate(blocks)}
+        resume = blocks[keep - 1].block.end + 1 if keep else None
+        updated = blocks[:keep]
+
+        for block in reader.iter_variable_blocks(content, resume):
+            # The scanner is reset at every block, so once a block starts in
+            # the unchanged tail where an old block started, the rest matches.
+            old_index = old_starts.get(block.start - delta)
+            if block.start >= len(content) - suffix and old_index is not None:
+                for entry in blocks[old_index:]:
+                    moved = entry.block._replace(
+                        start=entry.block.start + delta, end=entry.block.end + delta
+                    )
+                    updated.append(entry._replace(block=moved))
+                break
+
+            lines = reader.block_lines(content, block)
+            item, str_len = readme.parse_block(block.name, lines)
+            updated.append(_Parsed(block, item, str_len, construct_tf_variable(item)))
+            self.parsed_blocks += 1
+
+        self.content, self.blocks = content, updated
+        return updated
+
+
+class _BufferReadme(readme.Readme):
+    """A Readme fed from editor buffers and a warm ModuleState."""
+
+    def __init__(
+        self,
+        state: ModuleState,
+        variables_content: Optional[bytes],
+        readme_content: Optional[str],
+        documents: Dict[str, str],
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        self._state = state
+        self._variables_content = variables_content
+        self._readme_content = readme_content
+        self._documents = documents
+        self._texts: Dict[int, str] = {}
+        super().__init__(*args, **kwargs)
+
+    def _open_variables(self):
+        if self._variables_content is None:
+            with open(self.variables_file, "rb") as file:
+                self._variables_content = file.read()
+        return contextlib.nullcontext(self._variables_content)
+
+    def _parse_variables(self, buf):
+        for entry in self._state.update(bytes(buf)):
+            self._texts[id(entry.item)] = entry.text
+            yield entry.item, entry.str_len
+
+    def _scan_other_file(self, path):
+        # Open editor buffers win over the files on disk (--all-files).
+        content = self._documents.get(path)
+        if content is None:
+            return super()._scan_other_file(path)
+        return readme.scan_variables(content.encode("utf-8"))
+
+    def _open_readme(self):
+        if self._readme_content is not None:
+            return contextlib.nullcontext(self._readme_content.encode("utf-8"))
+        return super()._open_readme()
+
+    def _render_variables(self) -> str:
+        texts = self._texts
+        return "".join(texts[id(item)] for item in self.sorted_variables).rstrip() + "\n"
+
+
+def _uri_to_path(uri: str) -> str:
+    parsed = urlparse(uri)
+    if parsed.scheme not in ("", "file"):
+        raise _RequestError(_INVALID_PARAMS, f"Unsupported URI: {uri}")
+    return os.path.abspath(unquote(parsed.path))
+
+
+def _end_position(text: str) -> Dict[str, int]:
+    lines = text.split("\n")
+    return {"line": len(lines) - 1, "character": len(lines[-1].encode("utf-16-le")) // 2}
+
+
+class Server:
+    """
+    Handles one JSON-RPC message at a time. Documents are the latest text
+    sent by the editor for a path; everything else is read from disk.
+    """
+
+    def __init__(self, options: Options) -> None:
+        self.options = options
+        self.documents: Dict[str, str] = {}
+        self.modules: Dict[str, ModuleState] = {}
+        self.running = True
+        self._handlers = {
+            "initialize": self._initialize,
+            "shutdown": self._shutdown,
+            "exit": self._exit,
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            "textDocument/didClose": self._did_close,
+            "textDocument/formatting": self._formatting,
+            "tfdocs/render": self._render,
+        }
+
+    def serve(self, stdin: BinaryIO, stdout: BinaryIO) -> None:
+        while self.running:
+            try:
+                message = read_message(stdin)
+            except ValueError as exc:
+                write_message(stdout, _error(None, _PARSE_ERROR, str(exc)))
+                continue
+            if message is None:
+                return
+
+            response = self.handle(message)
+            if response is not None:
+                write_message(stdout, response)
+
+    def handle(self, message: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return _error(None, _INVALID_REQUEST, "Invalid request")
+
+        request_id = message.get("id")
+        method = message["method"]
+        handler = self._handlers.get(method)
+
+        if handler is None:
+            if request_id is None:
+                return None  # unknown notifications are ignored
+            return _error(request_id, _METHOD_NOT_FOUND, f"Unknown method: {method}")
+
+        try:
+            result = handler(message.get("params") or {})
+        except _RequestError as exc:
+            return _error(request_id, exc.code, str(exc))
+        except TfdocsError as exc:
+            return _error(request_id, _REQUEST_FAILED, str(exc))
+        except (KeyError, TypeError) as exc:
+            return _error(request_id, _INVALID_PARAMS, f"Invalid params: {exc}")
+        except Exception as exc:
+            return _error(request_id, _INTERNAL_ERROR, str(exc))
+
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def module_readme(self, module_dir: str) -> readme.Readme:
+        options = self.options
+        variables_path = os.path.join(module_dir, options.variables_file)
+        readme_path = os.path.join(module_dir, options.readme_file)
+        variables_content = self.documents.get(variables_path)
+
+        return _BufferReadme(
+            self.modules.setdefault(module_dir, ModuleState()),
+            None if variables_content is None else variables_content.encode("utf-8"),
+            self.documents.get(readme_path),
+            self.documents,
+            readme_path,
+            variables_path,
+            options.module_name or os.path.basename(module_dir),
+            options.source,
+            options.git_source,
+            module_path=module_dir,
+            scan_module=options.all_files,
+        )
+
+    # Lifecycle
+
+    def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "capabilities": {
+                "textDocumentSync": _TEXT_DOCUMENT_SYNC_FULL,
+                "documentFormattingProvider": True,
+            },
+            "serverInfo": {"name": "tfdocs", "version": __version__},
+        }
+
+    def _shutdown(self, params: Dict[str, Any]) -> None:
+        self.documents.clear()
+        self.modules.clear()
+
+    def _exit(self, params: Dict[str, Any]) -> None:
+        self.running = False
+
+    # Documents
+
+    def _did_open(self, params: Dict[str, Any]) -> None:
+        document = params["textDocument"]
+        self.documents[_uri_to_path(document["uri"])] = document["text"]
+
+    def _did_change(self, params: Dict[str, Any]) -> None:
+        path = _uri_to_path(params["textDocument"]["uri"])
+        for change in params["contentChanges"]:
+            if "range" in change:
+                raise _RequestError(_INVALID_PARAMS, "Only full document sync is supported")
+            self.documents[path] = change["text"]
+
+    def _did_close(self, params: Dict[str, Any]) -> None:
+        self.documents.pop(_uri_to_path(params["textDocument"]["uri"]), None)
+
+    def _formatting(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        path = _uri_to_path(params["textDocument"]["uri"])
+        if os.path.basename(path) != self.options.variables_file:
+            return []
+
+        rd = self.module_readme(os.path.dirname(path))
+        if not rd.variables_changed:
+            return []
+
+        current = self.documents.get(path)
+        if current is None:
+            with open(path, "r") as file:
+                current = file.read()
+
+        return [
+            {
+                "range": {
+                    "start": {"line": 0, "character": 0},
+                    "end": _end_position(current),
+                },
+                "newText": rd.variables_text(),
+            }
+        ]
+
+    # tfdocs
+
+    def _render(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Preview a module. ``params`` holds either the ``uri`` of any file in
+        the module or the module directory as ``path``.
+        """
+        if "uri" in params:
+            module_dir = os.path.dirname(_uri_to_path(params["uri"]))
+        else:
+            module_dir = os.path.abspath(params["path"])
+
+        rd = self.module_readme(module_dir)
+        readme_text = rd.readme_text()
+        status = rd.get_status()
+        return dataclasses.asdict(
+            Result(
+                module_dir,
+                rd.variables_text(),
+                readme_text,
+                status["variables"],
+                status["readme"],
+            )
+        )
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
+
+
+def read_message(stream: BinaryIO) -> Optional[Any]:
+    """Read one ``Content-Length`` framed message; None at end of input."""
+    length = None
+
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            if length is None:
+                continue
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+
+    body = stream.read(length)
+    try:
+        return json.loads(body)
+    except ValueError as exc:
+        raise ValueError(f"Invalid JSON: {exc}") from exc
+
+
+def write_message(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    body = json.dumps(message).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body))
+    stream.write(body)
+    stream.flush()
+
+
+def serve_stdio(options: Options) -> None:
+    Server(options).serve(sys.stdin.buffer, sys.stdout.buffer)
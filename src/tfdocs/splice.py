@@ -0,0 +1,116 @@
+"""
+Splice the generated section into an existing README by byte offsets.
+
+The markers are located with rfind() on the (usually memory-mapped) file and
+only the region between them is compared, so checking or updating a large
+README costs little more than the generated section itself. The results are
+the same as the line based splicing it replaces: the last START and END
+marker lines win, a line holding both counts as START, and the file is
+read with universal newlines.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, NamedTuple, Optional
+
+from tfdocs.reader import Buffer
+
+START_MARKER = b"<!-- TFDOCS START -->"
+END_MARKER = b"<!-- TFDOCS END -->"
+
+_COPY_SIZE = 1 << 20
+
+
+class Splice(NamedTuple):
+    # End of the START line, where the generated section begins.
+    head_end: int
+    # Start of what is kept after the section, None when nothing follows.
+    tail_start: Optional[int]
+
+
+def normalize(buf: Buffer) -> Buffer:
+    """Translate CR and CRLF line endings like text mode reads do."""
+    if buf.find(b"\r") == -1:
+        return buf
+    return buf[:].replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+def _line_end(buf: Buffer, pos: int) -> int:
+    newline = buf.find(b"\n", pos)
+    return len(buf) if newline == -1 else newline
+
+
+def find_splice(buf: Buffer) -> Optional[Splice]:
+    """Locate the markers in ``buf``; None when either one is missing."""
+    start = buf.rfind(START_MARKER)
+    if start == -1:
+        return None
+    head_end = _line_end(buf, start)
+
+    pos = len(buf)
+    while True:
+        end = buf.rfind(END_MARKER, 0, pos)
+        if end == -1:
+            return None
+        line_start = buf.rfind(b"\n", 0, end) + 1
+        if buf.find(START_MARKER, line_start, _line_end(buf, end)) == -1:
+            break
+        pos = line_start
+
+    if line_start > start:
+        return Splice(head_end, line_start)
+    # END comes before START: the section is inserted after the START line.
+    return Splice(head_end, head_end + 1 if head_end < len(buf) else None)
+
+
+def section_bytes(lines: List[str]) -> bytes:
+    return "\n".join(lines).encode("utf-8")
+
+
+def is_unchanged(buf: Buffer, splice: Splice, section: bytes) -> bool:
+    """Whether the region between the markers already holds ``section``."""
+    if splice.tail_start is None:
+        return False
+    if splice.tail_start - splice.head_end != len(section) + 2:
+        return False
+    return buf[splice.head_end : splice.tail_start] == b"\n" + section + b"\n"
+
+
+def new_readme(module_name: Optional[str], section: bytes) -> List[bytes]:
+    return [
+        f"# {module_name} module\n\n".encode("utf-8"),
+        START_MARKER + b"\n",
+        section,
+        b"\n" + END_MARKER + b"\n",
+    ]
+
+
+def _copy(buf: Buffer, start: int, end: int) -> Iterator[bytes]:
+    for pos in range(start, end, _COPY_SIZE):
+        yield buf[pos : min(pos + _COPY_SIZE, end)]
+
+
+def iter_chunks(
+    buf: Optional[Buffer], section: bytes, module_name: Optional[str]
+) -> Iterator[bytes]:
+    """
+    The README with ``section`` spliced into ``buf`` (the normalized file
+    contents, None for a missing file), in chunks of bounded size. Ends with
+    exactly one newline.
+    """
+    splice = find_splice(buf) if buf is not None else None
+    if splice is None:
+        yield from new_readme(module_name, section)
+        return
+
+    yield from _copy(buf, 0, splice.head_end)  # type: ignore[arg-type]
+    yield b"\n"
+    yield section
+    yield b"\n"
+
+    if splice.tail_start is None:
+        return
+
+    yield from _copy(buf, splice.tail_start, len(buf))  # type: ignore[arg-type]
+    if splice.tail_start < len(buf) and buf[-1] != ord("\n"):  # type: ignore[index]
+        yield b"\n"
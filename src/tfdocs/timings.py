@@ -0,0 +1,120 @@
+"""
+Per-phase timings for ``--timings``. Recording is off unless a run is
+wrapped in record(); timed() functions then add their wall time to the phase
+they belong to. Phases are exclusive: time spent in a nested phase (e.g.
+formatting while parsing) is only counted once, in the inner phase. Phases
+run on background threads are counted too, so when they overlap the phases
+can add up to more than the total.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+PHASES = ("parse", "format", "source", "readme", "write")
+SCHEMA_VERSION = 1
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Timings:
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.modules: List[Tuple[str, Dict[str, float]]] = []
+        self.started = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        nested: List[float] = self._local.__dict__.setdefault("nested", [])
+        start = time.perf_counter()
+        nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = nested.pop()
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed - inner
+            if nested:
+                nested[-1] += elapsed
+
+    def add_module(self, module_dir: str, phases: Dict[str, float]) -> None:
+        """Add the timings of a module processed elsewhere (e.g. a worker)."""
+        with self._lock:
+            self.modules.append((module_dir, phases))
+            for name, seconds in phases.items():
+                self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "version": SCHEMA_VERSION,
+            "total": time.perf_counter() - self.started,
+            "phases": dict(self.phases),
+            "modules": [
+                {"module": module_dir, "phases": phases}
+                for module_dir, phases in self.modules
+            ],
+        }
+
+
+_active: Optional[Timings] = None
+
+
+@contextlib.contextmanager
+def record() -> Iterator[Timings]:
+    """Record the phases of everything run inside the block."""
+    global _active
+    previous, _active = _active, Timings()
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def add_module(module_dir: str, phases: Dict[str, float]) -> None:
+    if _active is not None:
+        _active.add_module(module_dir, phases)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Count the calls of the decorated function towards phase ``name``."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:10.1f} ms"
+
+
+def format_timings(timings: Timings, output_format: str = "text") -> str:
+    data = timings.as_dict()
+    if output_format == "json":
+        import json
+
+        return json.dumps(data)
+
+    lines = []
+    if data["modules"]:
+        lines.append(f"Timings ({len(data['modules'])} modules processed):")
+    else:
+        lines.append("Timings:")
+    for name, seconds in data["phases"].items():
+        lines.append(f"  {name:<8}{_ms(seconds)}")
+    lines.append(f"  {'total':<8}{_ms(data['total'])}")
+    return "\n".join(lines)
@@ -1,32 +1,99 @@
+import functools
 import os
 import re
-import git
+import stat
+
+from tfdocs import gitsource
+from tfdocs.hcl import format_expression, split_spans
+from tfdocs.timings import timed
+
+
+_BLOCK_OPENS = {"{": "}", "(": ")", "[": "]", "<": ">"}
+_BLOCK_CLOSES = {v: k for k, v in _BLOCK_OPENS.items()}
+# Only quotes, brackets and escapes change the state, everything else is
+# skipped by the regex engine instead of being visited one char at a time.
+_BLOCK_TOKEN_RE = re.compile(r'\\.?|["{}()\[\]<>]', re.DOTALL)
+_BLOCK_TOKEN_BYTES_RE = re.compile(rb'\\.?|["{}()\[\]<>]', re.DOTALL)
+
+
+class BlockCounter:
+    """
+    Incremental form of count_blocks(). The bracket stack and string/escape
+    state carry over between feed() calls, so feeding a block line by line
+    costs O(total length) instead of rescanning the joined block every time.
+    """
+
+    __slots__ = ("_stack", "_in_string", "_esc", "_broken")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._stack: list = []
+        self._in_string = False
+        self._esc = False
+        self._broken = False
+
+    def feed(self, s) -> bool:
+        """
+        Consume ``s`` (str, or bytes from the mmap reader) and return True when
+        all brackets seen so far are closed.
+        """
+        if self._broken:
+            return False
+
+        stack = self._stack
+        pos = 0
+        binary = not isinstance(s, str)
+        token_re = _BLOCK_TOKEN_BYTES_RE if binary else _BLOCK_TOKEN_RE
+
+        if self._esc and s:
+            # A backslash ended the previous chunk and escapes this char.
+            self._esc = False
+            pos = 1
+            first = chr(s[0]) if binary else s[0]
+            if first != '"' and not self._in_string and not self._bracket(first):
+                return False
+
+        for match in token_re.finditer(s, pos):
+            token = match.group()
+            if binary:
+                token = token.decode("latin-1")
+
+            if token[0] == "\\":
+                if len(token) == 1:
+                    self._esc = True
+                    break
+                ch = token[1]
+                if ch == '"' or self._in_string:
+                    continue
+            else:
+                ch = token
+                if ch == '"':
+                    self._in_string = not self._in_string
+                    continue
+                if self._in_string:
+                    continue
+
+            if not self._bracket(ch):
+                return False
+
+        return not stack
+
+    def _bracket(self, ch: str) -> bool:
+        if ch in _BLOCK_OPENS:
+            self._stack.append(ch)
+        elif ch in _BLOCK_CLOSES:
+            if not self._stack or self._stack[-1] != _BLOCK_CLOSES[ch]:
+                self._broken = True  # a mismatch can never be balanced again
+                return False
+            self._stack.pop()
+        return True
 
 
 def count_blocks(data):
     s = "".join(data) if isinstance(data, list) else data
-    opens = {"{": "}", "(": ")", "[": "]", "<": ">"}
-    closes = {v: k for k, v in opens.items()}
-    stack = []
-
-    in_string = False
-    esc = False
-
-    for ch in s:
-        if ch == '"' and not esc:
-            in_string = not in_string
-        esc = (ch == "\\") and not esc
-        if in_string:
-            continue
-
-        if ch in opens:
-            stack.append(ch)
-        elif ch in closes:
-            if not stack or stack[-1] != closes[ch]:
-                return False  # early exit on mismatch
-            stack.pop()
-
-    return not stack
+    return BlockCounter().feed(s)
 
 
 def process_line_block(line_block, target_type, content, cont):
@@ -62,132 +129,60 @@ def match_type_constructors(string):
 
 
 def format_block(input_str: str, indent_level: int = 0, inline: bool = False) -> str:
-    input_str = input_str.strip()
-    indent = "  " * indent_level
-
-    if input_str.startswith("{") and input_str.endswith("}"):
-        return format_map(input_str[1:-1], indent_level, inline)
-
-    if input_str.startswith("[") and input_str.endswith("]"):
-        return format_list(input_str[1:-1], indent_level)
-
-    if "(" in input_str and input_str.endswith(")"):
-        return format_function_call(input_str, indent_level, inline)
-
-    return indent + input_str
+    return format_expression(input_str, indent_level, inline)
 
 
 def smart_split(s):
-    result = []
-    current = ""
-    depth = 0
-    in_string = False
-
-    for char in s:
-        if char == '"' and not current.endswith("\\"):
-            in_string = not in_string
-        if not in_string:
-            if char in "{[(":
-                depth += 1
-            elif char in "}])":
-                depth -= 1
-        if char == "," and depth == 0 and not in_string:
-            result.append(current.strip())
-            current = ""
-        else:
-            current += char
-    if current.strip():
-        result.append(current.strip())
-    return result
+    return [s[start:end] for start, end in split_spans(s, 0, len(s))]
 
 
 def format_map(content: str, indent_level: int, inline: bool = False) -> str:
-    if inline and content.strip() == "":
-        return "{}"
+    return format_expression("{" + content + "}", indent_level, inline)
 
-    if inline:
-        body_indent = "  " * (indent_level + 2)
-        closing_indent = "  " * (indent_level + 1)
-    else:
-        body_indent = "  " * (indent_level + 1)
-        closing_indent = "  " * indent_level
 
-    parts = smart_split(content)
-    kv_parts = [p for p in parts if "=" in p]
+def format_list(content: str, indent_level: int) -> str:
+    return format_expression("[" + content + "]", indent_level)
 
-    lines = []
-    for i, part in enumerate(kv_parts):
-        key, val = map(str.strip, part.split("=", 1))
-        formatted_val = format_block(val, indent_level + 1, inline=True).strip()
-        comma = "," if i < len(kv_parts) - 1 else ""
-        lines.append(f"{body_indent}{key} = {formatted_val}{comma}")
 
-    return "{\n" + "\n".join(lines) + f"\n{closing_indent}}}"
+_FUNCTION_CALL_RE = re.compile(r"\w+\(.*\)$", re.DOTALL)
 
 
-def format_list(content: str, indent_level: int) -> str:
-    opening_indent = "  " * indent_level
-    closing_indent = "  " * (indent_level + 1)
-
-    items = smart_split(content)
-    if not items:
-        return f"{opening_indent}[]"
-
-    rendered_items = []
-    for i, raw_item in enumerate(items):
-        formatted = format_block(raw_item, indent_level + 1).rstrip()
-        lines = formatted.splitlines()
-
-        if len(lines) > 1:
-            adjusted = []
-            for idx, line in enumerate(lines):
-                if idx == 0:
-                    target = indent_level + 2
-                elif idx == len(lines) - 1:
-                    target = indent_level + 2
-                else:
-                    target = indent_level + 3
-                adjusted.append(("  " * target) + line.strip())
-            item_block = "\n".join(adjusted)
-        else:
-            item_block = ("  " * (indent_level + 2)) + lines[0].strip()
+def format_function_call(content: str, indent_level: int, inline: bool = False) -> str:
+    if not _FUNCTION_CALL_RE.match(content.strip()):
+        return "  " * indent_level + content
+    return format_expression(content, indent_level, inline)
 
-        comma = "," if (len(items) > 1 and i < len(items) - 1) else ""
-        rendered_items.append(item_block + comma)
 
-    return f"{opening_indent}[\n" + "\n".join(rendered_items) + f"\n{closing_indent}]"
+# Formatted expressions kept per process. Modules tend to repeat the same
+# type and default shapes, so most lookups in a multi-module run are hits.
+# Larger expressions are rarely repeated and would keep megabytes alive in
+# long-running processes, so they are formatted without the memo.
+FORMAT_CACHE_SIZE = 4096
+FORMAT_CACHE_MAX_TEXT = 4096
 
 
-def format_function_call(content: str, indent_level: int, inline: bool = False) -> str:
-    match = re.match(r"^(\w+)\((.*)\)$", content.strip(), re.DOTALL)
-    if not match:
-        return "  " * indent_level + content
+@functools.lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def _format_memo(text, indent_level, inline):
+    return format_expression(text, indent_level, inline)
 
-    func_name, inner = match.groups()
-    inner = inner.strip()
 
-    if inner.startswith("{") and inner.endswith("}"):
-        adjusted_level = indent_level - 1 if inline else indent_level
-        formatted = format_block(inner, max(adjusted_level, 0), inline=True).strip()
-        return f"{func_name}({formatted})"
+def format_cached(text, indent_level=0, inline=False):
+    """
+    format_expression(), memoized on (text, indent_level, inline) for texts
+    of up to FORMAT_CACHE_MAX_TEXT characters.
+    """
+    if len(text) > FORMAT_CACHE_MAX_TEXT:
+        return format_expression(text, indent_level, inline)
+    return _format_memo(text, indent_level, inline)
 
-    if inner.startswith("[") and inner.endswith("]"):
-        formatted = format_block(inner, indent_level).strip()
-        return f"{func_name}({formatted})"
 
-    parts = smart_split(inner)
+def format_cache_info():
+    """Hits, misses and size of the format_cached() memo."""
+    return _format_memo.cache_info()
 
-    if inline and len(parts) == 1 and re.match(r"^\w+\(.*\)$", parts[0].strip()):
-        formatted_parts = [
-            format_block(parts[0], max(indent_level - 1, 0), inline=True).strip()
-        ]
-    else:
-        formatted_parts = [
-            format_block(part, indent_level + 1).strip() for part in parts
-        ]
 
-    joined = ", ".join(formatted_parts)
-    return f"{func_name}({joined})"
+def clear_format_cache():
+    _format_memo.cache_clear()
 
 
 def construct_tf_variable(content):
@@ -206,16 +201,16 @@ def construct_tf_variable(content):
 
     if desc_first:
         lines.append(f"  description = {desc_str}")
-        lines.append(f"  type = {format_block(type_str, inline=True)}")
+        lines.append(f"  type = {format_cached(type_str, 0, True)}")
     else:
-        lines.append(f"  type = {format_block(type_str, inline=True)}")
+        lines.append(f"  type = {format_cached(type_str, 0, True)}")
         lines.append(f"  description = {desc_str}")
 
     if has_default:
         if default_str == "{}":
             lines.append("  default = {}")
         else:
-            lines.append(f"  default = {format_block(default_str, inline=True)}")
+            lines.append(f"  default = {format_cached(default_str, 0, True)}")
 
     lines.append("}\n\n")
     return "\n".join(lines)
@@ -226,13 +221,82 @@ def construct_tf_file(content):
     return "".join(parts).rstrip() + "\n"
 
 
-def generate_source(module_name, source, source_git):
+def _create_temp(path):
+    """
+    Create an empty sibling of ``path`` for atomic_write(). Like mkstemp(),
+    but with the umask applied by the kernel to the default 0o666 mode.
+    """
+    directory, name = os.path.split(path)
+    while True:
+        tmp_path = os.path.join(directory, f".{name}.{os.urandom(4).hex()}.tmp")
+        try:
+            return os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+
+def atomic_write(path, data):
+    """
+    Replace ``path`` with ``data``, a str or an iterable of bytes chunks
+    streamed in order, through a temporary file in the same directory, so
+    readers never see a partially written file. Symlinks are written through
+    to their target. The file keeps its permissions; new files get the usual
+    umask based ones.
+    """
+    path = os.path.realpath(path)
+    fd, tmp_path = _create_temp(path)
+    text = isinstance(data, str)
+    try:
+        with os.fdopen(fd, "w" if text else "wb") as file:
+            file.writelines([data] if text else data)
+            file.flush()
+            os.fsync(file.fileno())
+
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@timed("source")
+def generate_source(module_name, source, source_git, module_path=None):
     if source and not source_git:
         return source
+    module_path = os.path.abspath(module_path or os.getcwd())
+
+    if "GIT_DIR" in os.environ:
+        return _generate_source_gitpython(module_name, source, module_path)
+
+    repo = gitsource.find_repo(module_path)
+    if repo is None:
+        return f"./modules/{module_name}"
+
+    repo_root, git_dir = repo
+    base = source or gitsource.origin_url(git_dir)
+    if not base:
+        return _generate_source_gitpython(module_name, source, module_path)
+
+    rel_path = os.path.relpath(module_path, repo_root)
+    return f"{base}//{rel_path}?ref=<TAG>"
+
+
+def _generate_source_gitpython(module_name, source, module_path):
+    # Slow path for setups the .git reader does not understand (GIT_DIR,
+    # origin defined in an included config file, ...).
+    import git
+
     try:
-        repo = git.Repo(search_parent_directories=True)
+        repo = git.Repo(module_path, search_parent_directories=True)
         repo_root = repo.working_tree_dir or repo.git.rev_parse("--show-toplevel")
-        rel_path = os.path.relpath(os.getcwd(), repo_root)
+        rel_path = os.path.relpath(module_path, repo_root)
         base = source or repo.remotes.origin.url
         return f"{base}//{rel_path}?ref=<TAG>"
     except git.exc.InvalidGitRepositoryError:
@@ -0,0 +1,261 @@
+"""
+``tfdocs --watch``: regenerate module documentation whenever a variables
+file (any .tf file with --all-files) or README changes. Uses inotify on
+Linux and falls back to polling.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from tfdocs import readme
+from tfdocs.cli import Options
+from tfdocs.output import echo
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 0.5
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_MODIFY
+_EVENT = struct.Struct("iIII")
+
+Fingerprint = Optional[Tuple[int, int]]
+
+
+def _fingerprint(path: str) -> Fingerprint:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class _Inotify:
+    """Minimal ctypes binding, watching directories so editor renames are seen."""
+
+    def __init__(self, directories: Set[str]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._dirs: Dict[int, str] = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+            self._dirs[wd] = directory
+
+    def wait(self, timeout: float) -> Set[str]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self._fd, 64 * 1024)
+        paths: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if wd in self._dirs and name:
+                paths.add(os.path.join(self._dirs[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _Poller:
+    def __init__(self, paths: Set[str], interval: float) -> None:
+        self._interval = interval
+        self._seen = {path: _fingerprint(path) for path in paths}
+
+    def wait(self, timeout: float) -> Set[str]:
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, seen in self._seen.items():
+                current = _fingerprint(path)
+                if current != seen:
+                    self._seen[path] = current
+                    changed.add(path)
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self._interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+class Watcher:
+    """
+    Keeps one parsed Readme per module and re-runs only the module whose
+    files changed. With --dry-run or --check the stale files are only
+    reported, never written. Changes arriving within ``debounce`` seconds of each other
+    are handled as one, and the files tfdocs wrote itself are ignored.
+    """
+
+    def __init__(
+        self,
+        module_dirs: List[str],
+        options: Options,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ) -> None:
+        self.options = options
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.regenerations = 0
+
+        self._modules: Dict[str, str] = {}
+        self._variables_paths: Set[str] = set()
+        self._tf_dirs: Dict[str, str] = {}
+        for module_dir in module_dirs:
+            variables_path = os.path.abspath(os.path.join(module_dir, options.variables_file))
+            readme_path = os.path.abspath(os.path.join(module_dir, options.readme_file))
+            self._modules[variables_path] = module_dir
+            self._modules[readme_path] = module_dir
+            self._variables_paths.add(variables_path)
+            if options.all_files:
+                # Every .tf file is documented; ones created later are picked
+                # up through their directory (inotify only).
+                self._tf_dirs[os.path.dirname(variables_path)] = module_dir
+                for path in readme.other_tf_files(variables_path):
+                    self._modules[path] = module_dir
+                    self._variables_paths.add(path)
+
+        self._readmes: Dict[str, readme.Readme] = {}
+        self._written: Dict[str, Fingerprint] = {}
+
+    def _backend(self):
+        if self.use_inotify:
+            try:
+                return _Inotify({os.path.dirname(path) for path in self._modules})
+            except (OSError, AttributeError, TypeError):
+                pass  # no inotify on this platform, fall back to polling
+        return _Poller(set(self._modules), self.poll_interval)
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        backend = self._backend()
+
+        try:
+            for module_dir in dict.fromkeys(self._modules.values()):
+                self.regenerate(module_dir, variables_changed=True)
+
+            while not stop.is_set():
+                changed = backend.wait(self.poll_interval)
+                if not changed:
+                    continue
+
+                while True:
+                    more = backend.wait(self.debounce)
+                    if not more:
+                        break
+                    changed |= more
+
+                self._dispatch(changed)
+        finally:
+            backend.close()
+
+    def _dispatch(self, paths: Set[str]) -> None:
+        modules: Dict[str, bool] = {}
+
+        for path in paths:
+            path = os.path.abspath(path)
+            module_dir = self._modules.get(path)
+            if module_dir is None and path.endswith(".tf"):
+                module_dir = self._tf_dirs.get(os.path.dirname(path))
+                if module_dir is not None:
+                    self._modules[path] = module_dir
+                    self._variables_paths.add(path)
+            if module_dir is None:
+                continue
+            if path in self._written and self._written[path] == _fingerprint(path):
+                continue  # our own write
+            modules[module_dir] = modules.get(module_dir, False) or (
+                path in self._variables_paths
+            )
+
+        for module_dir, variables_changed in modules.items():
+            self.regenerate(module_dir, variables_changed)
+
+    def regenerate(self, module_dir: str, variables_changed: bool) -> None:
+        options = self.options
+        variables_path = os.path.join(module_dir, options.variables_file)
+        readme_path = os.path.join(module_dir, options.readme_file)
+
+        try:
+            rd = self._readmes.get(module_dir)
+            if rd is None or variables_changed:
+                rd = readme.Readme(
+                    readme_path,
+                    variables_path,
+                    options.module_name or os.path.basename(os.path.abspath(module_dir)),
+                    options.source,
+                    options.git_source,
+                    module_path=module_dir,
+                    scan_module=options.all_files,
+                )
+                self._readmes[module_dir] = rd
+            else:
+                rd.reload_readme()
+
+            changed_files = []
+            if options.dry_run or options.check:
+                # Report only, like a one-off run with these flags.
+                status = rd.get_status()
+                if options.format and status["variables"]:
+                    changed_files.append(variables_path)
+                if status["readme"]:
+                    changed_files.append(readme_path)
+            else:
+                if options.format and rd.variables_changed:
+                    rd.write_variables()
+                    rd.variables_changed = False
+                    changed_files.append(variables_path)
+
+                rd.write_readme()
+                if rd.readme_changed:
+                    changed_files.append(readme_path)
+        except Exception as exc:
+            echo(f"[red]ERROR:[/] {module_dir}: {exc}")
+            return
+        finally:
+            for path in (variables_path, readme_path):
+                self._written[os.path.abspath(path)] = _fingerprint(path)
+
+        self.regenerations += 1
+        if changed_files and (options.dry_run or options.check):
+            echo(f"[red]stale:[/] {', '.join(changed_files)}")
+        elif changed_files:
+            echo(f"[green]Updated:[/] {', '.join(changed_files)}")
+
+
+def watch(paths: List[str], options: Options) -> None:
+    from tfdocs.batch import find_modules
+
+    module_dirs = [module for path in paths for module in find_modules(path, options.variables_file)]
+    if not module_dirs:
+        echo(f"[red]ERROR:[/] Cannot find {options.variables_file} in {', '.join(paths)}")
+        return
+
+    echo(f"[cyan]Watching {len(module_dirs)} module(s), press Ctrl+C to stop[/]")
+    Watcher(module_dirs, options).run()
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import tfdocs
+from tfdocs.cli import Options
+
+mock_variables_tf = """variable "var2" {
+  type = number
+  description = "This is variable 2"
+}
+
+variable "var1" {
+  type = string
+  description = "This is variable 1"
+}
+"""
+
+
+@pytest.fixture
+def module_dir(tmp_path):
+    module = tmp_path / "example"
+    module.mkdir()
+    (module / "variables.tf").write_text(mock_variables_tf)
+    return module
+
+
+def test_render(module_dir):
+    result = tfdocs.render(str(module_dir), Options(source="tfdocs"))
+
+    assert isinstance(result, tfdocs.Result)
+    assert result.variables.startswith('variable "var1" {')
+    assert result.readme.startswith("# example module\n")
+    assert "  var1 = <STRING>" in result.readme
+    assert result.variables_changed is True
+    assert result.readme_changed is True
+    assert result.written is False
+    assert not (module_dir / "README.md").exists()
+
+
+def test_render_write(module_dir):
+    result = tfdocs.render(str(module_dir), Options(source="tfdocs"), write=True)
+
+    assert result.written is True
+    assert (module_dir / "README.md").read_text() == result.readme
+    assert (module_dir / "variables.tf").read_text() == result.variables
+
+    result = tfdocs.render(str(module_dir), Options(source="tfdocs"))
+    assert result.variables_changed is False
+    assert result.readme_changed is False
+
+    # Nothing to write: up to date files are left alone.
+    result = tfdocs.render(str(module_dir), Options(source="tfdocs"), write=True)
+    assert result.written is False
+
+
+def test_render_missing_variables(tmp_path):
+    with pytest.raises(tfdocs.VariablesFileNotFoundError):
+        tfdocs.render(str(tmp_path))
+
+    with pytest.raises(tfdocs.TfdocsError):
+        tfdocs.render(str(tmp_path))
+
+
+def test_render_async(module_dir):
+    result = asyncio.run(tfdocs.render_async(str(module_dir), Options(source="tfdocs")))
+
+    assert "  var2 = <NUMBER>" in result.readme
+
+
+def test_render_does_not_create_console(module_dir, monkeypatch):
+    def fail():
+        raise AssertionError("a console was created")
+
+    monkeypatch.setattr("tfdocs.output.get_console", fail)
+    monkeypatch.setattr("tfdocs.readme.get_console", fail)
+    tfdocs.render(str(module_dir), Options(source="tfdocs"))
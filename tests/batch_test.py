@@ -0,0 +1,204 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from tfdocs import batch
+from tfdocs.__main__ import main
+from tfdocs.cli import Options
+
+mock_variables_tf = """
+variable "var2" {
+  type        = number
+  default     = 42
+  description = "This is variable 2"
+}
+
+variable "var1" {
+  type        = string
+  description = "This is variable 1"
+}
+"""
+
+
+@pytest.fixture
+def modules_root(tmp_path):
+    for name in ("network", "storage", os.path.join("nested", "compute")):
+        module_dir = tmp_path / name
+        module_dir.mkdir(parents=True)
+        (module_dir / "variables.tf").write_text(mock_variables_tf)
+
+    (tmp_path / "docs").mkdir()
+    hidden = tmp_path / ".terraform" / "cached"
+    hidden.mkdir(parents=True)
+    (hidden / "variables.tf").write_text(mock_variables_tf)
+
+    return tmp_path
+
+
+def test_find_modules(modules_root):
+    modules = batch.find_modules(str(modules_root))
+
+    assert modules == [
+        str(modules_root / "nested" / "compute"),
+        str(modules_root / "network"),
+        str(modules_root / "storage"),
+    ]
+
+
+def test_process_module(modules_root):
+    module_dir = str(modules_root / "network")
+    options = Options(format=True, source="git@git.com:tfdocs")
+
+    result = batch.process_module(module_dir, options)
+
+    assert result.error is None
+    assert result.status == {"readme": True, "variables": True}
+    with open(os.path.join(module_dir, "README.md")) as f:
+        content = f.read()
+    assert "module <network> {" in content
+    assert '  source = "git@git.com:tfdocs"' in content
+
+    result = batch.process_module(module_dir, options)
+    assert result.status == {"readme": False, "variables": False}
+
+
+def test_process_module_dry_run(modules_root):
+    module_dir = str(modules_root / "storage")
+    options = Options(format=True, dry_run=True, source="git@git.com:tfdocs")
+
+    result = batch.process_module(module_dir, options)
+
+    assert result.status == {"readme": True, "variables": True}
+    assert not os.path.exists(os.path.join(module_dir, "README.md"))
+
+
+def test_process_module_error(tmp_path):
+    result = batch.process_module(str(tmp_path), Options(source="tfdocs"))
+
+    assert result.error is not None
+    assert result.status == {}
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_modules(modules_root, jobs):
+    modules = batch.find_modules(str(modules_root))
+    options = Options(source="git@git.com:tfdocs")
+
+    results = batch.run_modules(modules, options, jobs)
+
+    assert [r.module_dir for r in results] == modules
+    assert all(r.status["readme"] for r in results)
+
+
+def test_main_recursive(modules_root, capsys):
+    root = str(modules_root)
+    argv = ["tfdocs", "--recursive", root, "--source", "tfdocs", "-j", "2"]
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(argv)
+    assert exc_info.value.code == -1
+    captured = capsys.readouterr()
+    assert "Updated:" in captured.out
+    assert os.path.join(root, "network", "README.md") in captured.out
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(argv)
+    assert exc_info.value.code == 0
+    captured = capsys.readouterr()
+    assert "Nothing to update!!!" in captured.out
+
+
+def test_main_recursive_timings(modules_root, capsys):
+    argv = ["tfdocs", "--recursive", str(modules_root), "--source", "tfdocs", "--no-cache"]
+
+    with pytest.raises(SystemExit):
+        main(argv + ["--timings", "--timings-format", "json", "-j", "2"])
+
+    data = json.loads(capsys.readouterr().err)
+    assert [module["module"] for module in data["modules"]] == [
+        str(modules_root / "nested" / "compute"),
+        str(modules_root / "network"),
+        str(modules_root / "storage"),
+    ]
+    assert data["phases"]["parse"] == pytest.approx(
+        sum(module["phases"]["parse"] for module in data["modules"])
+    )
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def modules_repo(modules_root):
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    git(modules_root, "init", "-q")
+    git(modules_root, "add", "-A")
+    git(modules_root, "commit", "-q", "-m", "initial")
+    return modules_root
+
+
+def test_changed_modules(modules_repo):
+    root = str(modules_repo)
+    options = Options()
+    assert batch.changed_modules([root], "HEAD", options) == []
+
+    (modules_repo / "network" / "variables.tf").write_text(mock_variables_tf + "\n")
+    (modules_repo / "nested" / "compute" / "README.md").write_text("# compute\n")
+    (modules_repo / "storage" / "main.tf").write_text("")
+    (modules_repo / ".terraform" / "cached" / "variables.tf").write_text("")
+    git(modules_repo, "add", "-A")
+    git(modules_repo, "commit", "-q", "-m", "change")
+
+    assert batch.changed_modules([root], "HEAD~1", options) == [
+        os.path.join(root, "nested", "compute"),
+        os.path.join(root, "network"),
+    ]
+    assert batch.changed_modules([os.path.join(root, "nested")], "HEAD~1", options) == [
+        os.path.join(root, "nested", "compute"),
+    ]
+    assert batch.changed_modules([root], "HEAD~1", Options(all_files=True)) == [
+        os.path.join(root, "nested", "compute"),
+        os.path.join(root, "network"),
+        os.path.join(root, "storage"),
+    ]
+
+
+def test_main_changed_since(modules_repo, capsys):
+    root = str(modules_repo)
+    (modules_repo / "storage" / "variables.tf").write_text(mock_variables_tf + "\n")
+    argv = ["tfdocs", "--changed-since", "HEAD", "--source", "tfdocs", root]
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(argv + ["--no-cache"])
+    assert exc_info.value.code == -1
+    captured = capsys.readouterr()
+    assert os.path.join(root, "storage", "README.md") in captured.out
+    assert not (modules_repo / "network" / "README.md").exists()
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(argv + ["--no-cache"])
+    assert exc_info.value.code == 0
+    assert "Nothing to update!!!" in capsys.readouterr().out
+
+
+def test_main_changed_since_errors(modules_repo, tmp_path_factory, capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs", "--changed-since", "no-such-ref", str(modules_repo)])
+    assert exc_info.value.code == -1
+    assert "git diff --merge-base no-such-ref failed" in capsys.readouterr().out
+
+    outside = tmp_path_factory.mktemp("outside")
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs", "--changed-since", "HEAD", str(outside)])
+    assert exc_info.value.code == -1
+    assert "is not in a git repository" in capsys.readouterr().out
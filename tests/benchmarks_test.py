@@ -0,0 +1,54 @@
+import json
+
+from benchmarks import corpus
+from benchmarks import run
+from tfdocs import utils
+
+
+def test_corpus_is_well_formed():
+    text = corpus.variables_file(3, depth=3, override=True)
+    assert text.count('variable "var_') == 3
+    assert utils.count_blocks(text)
+    assert utils.count_blocks(corpus.nested_type(8))
+    assert utils.count_blocks(corpus.list_default(5))
+
+
+def test_best_of_setup():
+    made = []
+    timed = []
+
+    def setup():
+        made.append(len(made))
+        return made[-1]
+
+    assert run.best_of(timed.append, 3, setup=setup) >= 0
+    assert timed == [0, 1, 2]
+
+
+def test_run_suite(tmp_path):
+    output = tmp_path / "bench.json"
+    run.main(["--sizes", "5", "--scenarios", "flat,long_lists", "--repeat", "1", "-o", str(output)])
+
+    report = json.loads(output.read_text())
+    benchmarks = {row["benchmark"] for row in report["results"]}
+    assert {row["scenario"] for row in report["results"]} == {"flat", "long_lists"}
+    assert benchmarks == {
+        "count_blocks",
+        "smart_split",
+        "format_block",
+        "construct_tf_file",
+        "Readme.__init__",
+        "construct_readme",
+    }
+    assert all(row["seconds"] >= 0 for row in report["results"])
+
+    assert {row["benchmark"] for row in report["memory"]} == {
+        "Readme.__init__",
+        "variables as dicts",
+        "variables as records",
+    }
+
+
+def test_records_use_less_memory_than_dicts():
+    memory = {row["benchmark"]: row for row in run.bench_memory("flat", 200)}
+    assert memory["variables as records"]["retained_bytes"] < memory["variables as dicts"]["retained_bytes"]
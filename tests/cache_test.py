@@ -0,0 +1,189 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tfdocs import batch
+from tfdocs import cache
+from tfdocs import gitsource
+from tfdocs.__main__ import main
+from tfdocs.cli import Options
+
+mock_variables_tf = """variable "var1" {
+  type = string
+  description = "This is variable 1"
+}
+"""
+
+
+@pytest.fixture
+def module_dir(tmp_path):
+    (tmp_path / "variables.tf").write_text(mock_variables_tf)
+    (tmp_path / "README.md").write_text("# Example\n")
+    return tmp_path
+
+
+def test_cache_key(module_dir, monkeypatch):
+    monkeypatch.chdir(module_dir)  # outside any git repository
+    variables_path = str(module_dir / "variables.tf")
+    readme_path = str(module_dir / "README.md")
+    options = Options()
+
+    key = cache.cache_key(options, variables_path, readme_path, "example")
+    assert key == cache.cache_key(options, variables_path, readme_path, "example")
+    assert key != cache.cache_key(options, variables_path, readme_path, "other")
+    assert key != cache.cache_key(Options(format=False), variables_path, readme_path, "example")
+    assert key == cache.cache_key(Options(jobs=4), variables_path, readme_path, "example")
+
+    (module_dir / "README.md").write_text("# Changed\n")
+    assert key != cache.cache_key(options, variables_path, readme_path, "example")
+
+    all_files = Options(all_files=True)
+    key = cache.cache_key(all_files, variables_path, readme_path, "example")
+    (module_dir / "variables-extra.tf").write_text(mock_variables_tf)
+    assert key != cache.cache_key(all_files, variables_path, readme_path, "example")
+
+    os.remove(readme_path)
+    assert cache.cache_key(options, variables_path, readme_path, "example") is not None
+    assert cache.cache_key(options, str(module_dir / "missing.tf"), readme_path, "example") is None
+
+
+def test_cache_key_module_source(module_dir, monkeypatch):
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    variables_path = str(module_dir / "variables.tf")
+    readme_path = str(module_dir / "README.md")
+    config = module_dir / ".git" / "config"
+    config.parent.mkdir()
+
+    def key(options=Options()):
+        gitsource.clear_cache()
+        return cache.cache_key(options, variables_path, readme_path, "m", str(module_dir))
+
+    outside = key()
+    config.write_text('[remote "origin"]\n\turl = git@a:x\n')
+    inside = key()
+    assert inside != outside
+
+    config.write_text('[remote "origin"]\n\turl = git@b:x\n')
+    assert key() != inside
+
+    # The source comes from git (included config, GIT_DIR): never cached.
+    config.write_text("[core]\n")
+    assert key() is None
+    config.write_text('[remote "origin"]\n\turl = git@a:x\n')
+    monkeypatch.setenv("GIT_DIR", str(config.parent))
+    assert key() is None
+
+    explicit = Options(source="tfdocs")
+    assert key(explicit) is not None
+    assert key(Options(source="tfdocs", git_source=True)) is None
+    gitsource.clear_cache()
+
+
+def test_is_clean():
+    assert cache.is_clean({"readme": False, "variables": False}, Options())
+    assert cache.is_clean({"readme": False, "variables": True}, Options(format=False))
+    assert not cache.is_clean({"readme": False, "variables": True}, Options())
+    assert not cache.is_clean({"readme": True, "variables": False}, Options())
+
+
+def test_result_cache_persistence(tmp_path):
+    result_cache = cache.ResultCache(str(tmp_path))
+    assert not result_cache.hit("abc")
+    assert not result_cache.hit(None)
+    result_cache.add("abc")
+    result_cache.close()
+
+    result_cache = cache.ResultCache(str(tmp_path))
+    assert result_cache.hit("abc")
+    result_cache.close()
+
+
+def test_result_cache_concurrent_runs(tmp_path):
+    first = cache.ResultCache(str(tmp_path))
+    first.add("k1")
+    first.close()
+
+    # A run in progress holds no lock between its lookups and close().
+    running = cache.ResultCache(str(tmp_path))
+    assert running.hit("k1")
+    assert not running.hit("missing")
+    running.add("k2")
+
+    other = cache.ResultCache(str(tmp_path))
+    started = time.monotonic()
+    assert other.hit("k1")
+    other.add("k3")
+    other.close()
+    assert time.monotonic() - started < 1
+
+    running.close()
+    result_cache = cache.ResultCache(str(tmp_path))
+    assert all(result_cache.hit(key) for key in ("k1", "k2", "k3"))
+    result_cache.close()
+
+
+def test_result_cache_lru_eviction(tmp_path):
+    result_cache = cache.ResultCache(str(tmp_path), max_entries=2)
+    with patch("tfdocs.cache.time.time", side_effect=[1, 2, 3, 4]):
+        result_cache.add("first")
+        result_cache.add("second")
+        assert result_cache.hit("first")
+        result_cache.add("third")
+    result_cache.close()
+
+    result_cache = cache.ResultCache(str(tmp_path), max_entries=2)
+    assert len(result_cache) == 2
+    assert result_cache.hit("first")
+    assert result_cache.hit("third")
+    assert not result_cache.hit("second")
+    result_cache.close()
+
+
+def test_result_cache_unusable_directory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+
+    result_cache = cache.ResultCache(str(blocker / "cache"))
+    result_cache.add("abc")
+    assert not result_cache.hit("abc")
+    result_cache.close()
+
+
+def test_run_modules_skips_cached_modules(module_dir, tmp_path):
+    options = Options(source="tfdocs")
+    modules = [str(module_dir)]
+    result_cache = cache.ResultCache(str(tmp_path / "cache"))
+
+    # First run writes the README, second finds it clean and records it.
+    batch.run_modules(modules, options, 1, result_cache)
+    results = batch.run_modules(modules, options, 1, result_cache)
+    assert results[0].status == {"readme": False, "variables": False}
+
+    with patch("tfdocs.batch.process_module") as process_module:
+        results = batch.run_modules(modules, options, 1, result_cache)
+    process_module.assert_not_called()
+    assert results[0].status == {"readme": False, "variables": False}
+    result_cache.close()
+
+
+def test_main_cache_hit_skips_parsing(module_dir, monkeypatch, capsys):
+    monkeypatch.chdir(module_dir)
+    argv = ["tfdocs", "--source", "tfdocs"]
+
+    for _ in range(2):
+        with pytest.raises(SystemExit):
+            main(argv)
+
+    with patch("tfdocs.readme.Readme") as mock_readme:
+        with pytest.raises(SystemExit) as exc_info:
+            main(argv)
+        assert exc_info.value.code == 0
+        mock_readme.assert_not_called()
+
+        with pytest.raises(SystemExit):
+            main(argv + ["--no-cache"])
+        mock_readme.assert_called_once()
+
+    assert "Nothing to update!!!" in capsys.readouterr().out
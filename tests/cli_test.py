@@ -14,6 +14,13 @@ def test_default_options():
     assert options.source is None
     assert options.git_source is False
     assert options.module_name is None
+    assert options.recursive is None
+    assert options.jobs is None
+    assert options.no_cache is False
+    assert options.watch is False
+    assert options.check is False
+    assert options.all_files is False
+    assert options.paths == []
 
 
 def test_custom_module_name():
@@ -68,6 +75,75 @@ def test_version_flag():
     assert options.version is True
 
 
+def test_recursive_options():
+    """Test recursive and jobs options."""
+    options = get_parser(["--recursive", "modules", "--jobs", "4"])
+    assert options.recursive == "modules"
+    assert options.jobs == 4
+
+    options = get_parser(["-r", "modules", "-j", "2"])
+    assert options.recursive == "modules"
+    assert options.jobs == 2
+
+
+def test_no_cache_flag():
+    """Test no-cache flag."""
+    options = get_parser(["--no-cache"])
+    assert options.no_cache is True
+
+
+def test_watch_paths():
+    """Test watch flag with module paths."""
+    options = get_parser(["--watch", "modules/a", "modules/b"])
+    assert options.watch is True
+    assert options.paths == ["modules/a", "modules/b"]
+
+
+def test_check_flag():
+    """Test check flag."""
+    options = get_parser(["--check", "modules"])
+    assert options.check is True
+    assert options.paths == ["modules"]
+
+
+def test_all_files_flag():
+    """Test all-files flag."""
+    options = get_parser(["--all-files"])
+    assert options.all_files is True
+
+
+def test_changed_since_flag():
+    """Test changed-since flag."""
+    options = get_parser(["--changed-since", "origin/main"])
+    assert options.changed_since == "origin/main"
+    assert get_parser([]).changed_since is None
+
+
+def test_serve_command():
+    """Test the serve subcommand."""
+    options = get_parser(["serve", "--stdio", "--variables", "vars.tf"])
+    assert options.serve is True
+    assert options.stdio is True
+    assert options.variables_file == "vars.tf"
+    assert options.paths == []
+
+    options = get_parser(["modules/serve"])
+    assert options.serve is False
+
+
+def test_timings_flags():
+    """Test timings and profile flags."""
+    options = get_parser([])
+    assert options.timings is False
+    assert options.timings_format == "text"
+    assert options.profile is None
+
+    options = get_parser(["--timings", "--timings-format", "json", "--profile", "out.pstats"])
+    assert options.timings is True
+    assert options.timings_format == "json"
+    assert options.profile == "out.pstats"
+
+
 def test_get_version():
     """Test get_version returns a string."""
     version = get_version()
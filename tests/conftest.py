@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+
+def pytest_collection_modifyitems(config, items):
+    """Timing assertions depend on the machine, they only run when asked for."""
+    if os.environ.get("TFDOCS_PERF_TESTS") == "1":
+        return
+    skip = pytest.mark.skip(reason="set TFDOCS_PERF_TESTS=1 to run timing tests")
+    for item in items:
+        if item.get_closest_marker("perf"):
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    """Keep the result cache of every test out of the user's cache directory."""
+    monkeypatch.setenv("TFDOCS_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
@@ -0,0 +1,89 @@
+import pytest
+
+from tfdocs import gitsource
+from tfdocs import utils
+
+config = """[core]
+\trepositoryformatversion = 0
+[remote "upstream"]
+\turl = git@github.com:other/repo.git
+[remote "origin"]
+\turl = "git@github.com:vajeen/tfdocs.git" ; comment
+\tfetch = +refs/heads/*:refs/remotes/origin/*
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    gitsource.clear_cache()
+    yield
+    gitsource.clear_cache()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git_dir = tmp_path / "repo" / ".git"
+    git_dir.mkdir(parents=True)
+    (git_dir / "config").write_text(config)
+    (tmp_path / "repo" / "modules" / "network").mkdir(parents=True)
+    return tmp_path / "repo"
+
+
+def test_find_repo(repo, tmp_path):
+    module = str(repo / "modules" / "network")
+    assert gitsource.find_repo(module) == (str(repo), str(repo / ".git"))
+
+
+def test_find_repo_outside_repository(tmp_path):
+    assert gitsource.find_repo(str(tmp_path)) is None
+
+
+def test_origin_url(repo):
+    assert gitsource.origin_url(str(repo / ".git")) == "git@github.com:vajeen/tfdocs.git"
+
+
+def test_origin_url_missing(tmp_path):
+    (tmp_path / "config").write_text("[core]\n\tbare = false\n")
+    assert gitsource.origin_url(str(tmp_path)) is None
+    assert gitsource.origin_url(str(tmp_path / "missing")) is None
+
+
+def test_worktree(repo, tmp_path):
+    worktree_git_dir = repo / ".git" / "worktrees" / "feature"
+    worktree_git_dir.mkdir(parents=True)
+    (worktree_git_dir / "commondir").write_text("../..\n")
+    worktree = tmp_path / "feature"
+    (worktree / "modules" / "network").mkdir(parents=True)
+    (worktree / ".git").write_text(f"gitdir: {worktree_git_dir}\n")
+
+    found = gitsource.find_repo(str(worktree / "modules" / "network"))
+    assert found == (str(worktree), str(worktree_git_dir))
+    assert gitsource.origin_url(found[1]) == "git@github.com:vajeen/tfdocs.git"
+
+
+def test_relative_gitdir_file(repo, tmp_path):
+    submodule_git_dir = repo / ".git" / "modules" / "child"
+    submodule_git_dir.mkdir(parents=True)
+    (submodule_git_dir / "config").write_text('[remote "origin"]\n\turl = https://example.com/child.git\n')
+    child = repo / "child"
+    child.mkdir()
+    (child / ".git").write_text("gitdir: ../.git/modules/child\n")
+
+    found = gitsource.find_repo(str(child))
+    assert found == (str(child), str(submodule_git_dir))
+    assert gitsource.origin_url(found[1]) == "https://example.com/child.git"
+
+
+def test_generate_source(repo, tmp_path, monkeypatch):
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    module = str(repo / "modules" / "network")
+
+    assert (
+        utils.generate_source("network", None, False, module)
+        == "git@github.com:vajeen/tfdocs.git//modules/network?ref=<TAG>"
+    )
+    assert (
+        utils.generate_source("network", "git@git.com:tfdocs", True, module)
+        == "git@git.com:tfdocs//modules/network?ref=<TAG>"
+    )
+    assert utils.generate_source("network", None, False, str(tmp_path)) == "./modules/network"
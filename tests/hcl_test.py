@@ -0,0 +1,248 @@
+import random
+import re
+
+import pytest
+
+from tfdocs import hcl
+from tfdocs import utils
+
+expressions = [
+    "string",
+    "my default string",
+    '"myapp-1.1.1"',
+    "40",
+    "{}",
+    "[]",
+    "list(string)",
+    "map(object({var1 = string,var2 = list(string),var3 = string}))",
+    "map(object({ tags = list(string),vhosts = list(string)}))",
+    "list(object({name = string,size = number,directory = string}))",
+    'tuple([string, number, bool])',
+    'object({ a = optional(string, "x"), b = optional(list(object({ c = number })), []) })',
+    '[{name = "name1",size = 10,directory = "dir1"},{name = "name2",size = 15,directory = "dir2"}]',
+    '{"user1"={tags=["tag1"],vhosts=["vh1"]},"user2"={tags=["tag2"],vhosts=["vh2"]}}',
+    '{"monitor"={tags=["tag3"],vhosts=["vh1","vh2","vh3"]}}',
+    '[[1, 2], [3, [4, 5]], []]',
+    '["a,b", "c\\"d", "{not a map}"]',
+    'merge({a = 1}, {b = 2})',
+    '{a = 1} + {b = 2}',
+    'f(a) + g(b)',
+    '{ key = "value=with=equals" }',
+    "{a = [1,2,}",
+]
+
+
+def test_parse_expression():
+    node = hcl.parse_expression("map(object({ tags = list(string), size = 1 }))")
+
+    assert isinstance(node, hcl.Call)
+    assert node.name == "map"
+    obj = node.args[0]
+    assert isinstance(obj, hcl.Call)
+    assert isinstance(obj.body, hcl.Map)
+    assert obj.body.keys == ["tags", "size"]
+    assert isinstance(obj.body.values[0], hcl.Call)
+    assert isinstance(obj.body.values[1], hcl.Literal)
+
+    node = hcl.parse_expression('["a", ["b"]]')
+    assert isinstance(node, hcl.ListNode)
+    assert [type(item) for item in node.items] == [hcl.Literal, hcl.ListNode]
+
+    # Unpaired brackets are taken at face value, as format_block() always did.
+    node = hcl.parse_expression("{a = (1}")
+    assert isinstance(node, hcl.Map)
+    assert node.keys == ["a"]
+    assert node.values[0].text == "(1"
+
+    node = hcl.parse_expression("{a = 1} + {b = 2}")
+    assert isinstance(node, hcl.Map)
+    assert node.values[0].text == "1} + {b = 2"
+
+
+@pytest.mark.parametrize("expression", expressions)
+@pytest.mark.parametrize("indent_level", [0, 1, 3])
+@pytest.mark.parametrize("inline", [False, True])
+def test_format_expression_matches_format_block(expression, indent_level, inline):
+    assert hcl.format_expression(expression, indent_level, inline) == utils.format_block(
+        expression, indent_level, inline
+    )
+
+
+# The recursive formatter format_block() used to be, kept as the reference
+# for the frame based one.
+
+
+def legacy_format_block(input_str, indent_level=0, inline=False):
+    input_str = input_str.strip()
+    indent = "  " * indent_level
+
+    if input_str.startswith("{") and input_str.endswith("}"):
+        return legacy_format_map(input_str[1:-1], indent_level, inline)
+
+    if input_str.startswith("[") and input_str.endswith("]"):
+        return legacy_format_list(input_str[1:-1], indent_level)
+
+    if "(" in input_str and input_str.endswith(")"):
+        return legacy_format_function_call(input_str, indent_level, inline)
+
+    return indent + input_str
+
+
+def legacy_smart_split(s):
+    result = []
+    current = ""
+    depth = 0
+    in_string = False
+
+    for char in s:
+        if char == '"' and not current.endswith("\\"):
+            in_string = not in_string
+        if not in_string:
+            if char in "{[(":
+                depth += 1
+            elif char in "}])":
+                depth -= 1
+        if char == "," and depth == 0 and not in_string:
+            result.append(current.strip())
+            current = ""
+        else:
+            current += char
+    if current.strip():
+        result.append(current.strip())
+    return result
+
+
+def legacy_format_map(content, indent_level, inline=False):
+    if inline and content.strip() == "":
+        return "{}"
+
+    if inline:
+        body_indent = "  " * (indent_level + 2)
+        closing_indent = "  " * (indent_level + 1)
+    else:
+        body_indent = "  " * (indent_level + 1)
+        closing_indent = "  " * indent_level
+
+    parts = legacy_smart_split(content)
+    kv_parts = [p for p in parts if "=" in p]
+
+    lines = []
+    for i, part in enumerate(kv_parts):
+        key, val = map(str.strip, part.split("=", 1))
+        formatted_val = legacy_format_block(val, indent_level + 1, inline=True).strip()
+        comma = "," if i < len(kv_parts) - 1 else ""
+        lines.append(f"{body_indent}{key} = {formatted_val}{comma}")
+
+    return "{\n" + "\n".join(lines) + f"\n{closing_indent}}}"
+
+
+def legacy_format_list(content, indent_level):
+    opening_indent = "  " * indent_level
+    closing_indent = "  " * (indent_level + 1)
+
+    items = legacy_smart_split(content)
+    if not items:
+        return f"{opening_indent}[]"
+
+    rendered_items = []
+    for i, raw_item in enumerate(items):
+        formatted = legacy_format_block(raw_item, indent_level + 1).rstrip()
+        lines = formatted.splitlines()
+
+        if len(lines) > 1:
+            adjusted = []
+            for idx, line in enumerate(lines):
+                if idx == 0 or idx == len(lines) - 1:
+                    target = indent_level + 2
+                else:
+                    target = indent_level + 3
+                adjusted.append(("  " * target) + line.strip())
+            item_block = "\n".join(adjusted)
+        else:
+            item_block = ("  " * (indent_level + 2)) + lines[0].strip()
+
+        comma = "," if (len(items) > 1 and i < len(items) - 1) else ""
+        rendered_items.append(item_block + comma)
+
+    return f"{opening_indent}[\n" + "\n".join(rendered_items) + f"\n{closing_indent}]"
+
+
+def legacy_format_function_call(content, indent_level, inline=False):
+    match = re.match(r"^(\w+)\((.*)\)$", content.strip(), re.DOTALL)
+    if not match:
+        return "  " * indent_level + content
+
+    func_name, inner = match.groups()
+    inner = inner.strip()
+
+    if inner.startswith("{") and inner.endswith("}"):
+        adjusted_level = indent_level - 1 if inline else indent_level
+        formatted = legacy_format_block(inner, max(adjusted_level, 0), inline=True).strip()
+        return f"{func_name}({formatted})"
+
+    if inner.startswith("[") and inner.endswith("]"):
+        formatted = legacy_format_block(inner, indent_level).strip()
+        return f"{func_name}({formatted})"
+
+    parts = legacy_smart_split(inner)
+
+    if inline and len(parts) == 1 and re.match(r"^\w+\(.*\)$", parts[0].strip()):
+        formatted_parts = [
+            legacy_format_block(parts[0], max(indent_level - 1, 0), inline=True).strip()
+        ]
+    else:
+        formatted_parts = [
+            legacy_format_block(part, indent_level + 1).strip() for part in parts
+        ]
+
+    return f"{func_name}({', '.join(formatted_parts)})"
+
+
+def outcome(func, *args):
+    try:
+        return func(*args)
+    except Exception as exc:  # the legacy formatter fails on some inputs
+        return type(exc)
+
+
+@pytest.mark.parametrize("expression", expressions)
+@pytest.mark.parametrize("indent_level", [0, 1, 3])
+@pytest.mark.parametrize("inline", [False, True])
+def test_matches_legacy_formatter(expression, indent_level, inline):
+    expected = legacy_format_block(expression, indent_level, inline)
+    assert utils.format_block(expression, indent_level, inline) == expected
+    assert hcl.format_expression(expression, indent_level, inline) == expected
+
+
+def random_expression(rng, depth=0):
+    if depth > 4 or rng.random() < 0.3:
+        return rng.choice(["string", "1", '"a,b"', '"x\\"y"', "", " ", "a\nb", "f(x)", "x = 1"])
+    items = [random_expression(rng, depth + 1) for _ in range(rng.randrange(4))]
+    sep = rng.choice([",", ", ", ",\n", " , "])
+    kind = rng.randrange(5)
+    if kind == 0:
+        return "[" + sep.join(items) + rng.choice(["", ","]) + "]"
+    if kind == 1:
+        return "{" + sep.join(f"k{i} = {item}" for i, item in enumerate(items)) + "}"
+    if kind == 2:
+        return rng.choice(["object", "map", "list", "f"]) + "(" + sep.join(items) + ")"
+    if kind == 3:
+        return rng.choice(["object", "optional"]) + "({" + sep.join(f"k = {item}" for item in items) + "})"
+    return " ".join(items)
+
+
+def test_random_expressions_match_legacy_formatter():
+    rng = random.Random(5)
+    noise = '{}[](),="\\ \nab'
+
+    for _ in range(3000):
+        text = random_expression(rng)
+        if rng.random() < 0.3:  # break it up so that unpaired brackets show up too
+            pos = rng.randrange(len(text) + 1)
+            text = text[:pos] + rng.choice(noise) + text[pos:]
+        indent_level = rng.randrange(3)
+        inline = rng.random() < 0.5
+
+        expected = outcome(legacy_format_block, text, indent_level, inline)
+        assert outcome(utils.format_block, text, indent_level, inline) == expected, text
+        assert outcome(hcl.format_expression, text, indent_level, inline) == expected, text
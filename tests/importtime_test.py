@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time budget for `tfdocs.__main__`, in microseconds.
+# rich and GitPython alone used to cost well over 100ms.
+IMPORT_BUDGET_US = 150_000
+
+
+def run_python(*args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_time_us():
+    result = run_python("-X", "importtime", "-c", "import tfdocs.__main__")
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == "tfdocs.__main__":
+            return int(fields[1])
+    raise AssertionError("tfdocs.__main__ missing from -X importtime output")
+
+
+def test_heavy_modules_are_not_imported():
+    result = run_python(
+        "-c",
+        "import sys, tfdocs.__main__; "
+        "print(sorted(m for m in ('rich', 'git', 'concurrent.futures.process') if m in sys.modules))",
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.perf
+def test_import_time_budget():
+    # Best of three to keep scheduler noise out of the measurement.
+    best = min(import_time_us() for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"importing tfdocs.__main__ took {best}us"
+
+
+def test_plain_output_when_not_a_tty(capsys):
+    from tfdocs.output import echo
+
+    echo("[green]Updated:[/] README.md")
+    assert capsys.readouterr().out == "Updated: README.md\n"
+
+    # Brackets that are not tfdocs markup are part of the message.
+    echo("[red]stale:[/red] modules/list[a]/README.md, default = [] [x]")
+    assert capsys.readouterr().out == "stale: modules/list[a]/README.md, default = [] [x]\n"
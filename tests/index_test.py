@@ -0,0 +1,181 @@
+import json
+import os
+
+import pytest
+
+from tfdocs import index
+from tfdocs.__main__ import main
+from tfdocs.cli import Options
+
+mock_variables_tf = """# Inputs
+
+variable "var2" {
+  type        = number
+  default     = 42
+  description = "This is variable 2"
+}
+
+variable "var1" {
+  # tfdocs: type = list(string)
+  type        = any
+  description = "This is variable 1"
+}  \r
+"""
+
+
+@pytest.fixture
+def module_dir(tmp_path):
+    module = tmp_path / "network"
+    module.mkdir()
+    (module / "variables.tf").write_bytes(mock_variables_tf.encode())
+    (module / "outputs.tf").write_text('variable "extra" {\n  type = bool\n}\n')
+    return module
+
+
+def test_module_record(module_dir):
+    record = index.module_record(str(module_dir), Options())
+
+    assert record["version"] == index.SCHEMA_VERSION
+    assert record["module"] == "network"
+    assert record["path"] == str(module_dir)
+    assert record["variables"] == [
+        {
+            "name": "var2",
+            "type": "number",
+            "type_override": None,
+            "description": '"This is variable 2"',
+            "default": "42",
+            "file": "variables.tf",
+            "span": [10, 108],
+        },
+        {
+            "name": "var1",
+            "type": "any",
+            "type_override": "list(string)",
+            "description": '"This is variable 1"',
+            "default": None,
+            "file": "variables.tf",
+            "span": [110, 218],
+        },
+    ]
+
+    content = mock_variables_tf.encode()
+    for variable in record["variables"]:
+        start, end = variable["span"]
+        block = content[start:end].decode()
+        assert block.startswith(f'variable "{variable["name"]}" {{')
+        assert block.endswith("}")
+
+
+def test_all_files(module_dir):
+    record = index.module_record(str(module_dir), Options(all_files=True))
+
+    assert [(v["name"], v["file"]) for v in record["variables"]] == [
+        ("var2", "variables.tf"),
+        ("var1", "variables.tf"),
+        ("extra", "outputs.tf"),
+    ]
+
+
+def test_write_index(module_dir, tmp_path):
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    (empty / "variables.tf").write_text("")
+    path = tmp_path / "index.json"
+
+    index.write_index(str(path), [str(module_dir), str(empty)], Options())
+
+    lines = path.read_text().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["module"] for record in records] == ["network", "empty"]
+    assert records[1]["variables"] == []
+
+
+def test_main_emit_index(module_dir, tmp_path, monkeypatch, capsys):
+    path = tmp_path / "index.json"
+    monkeypatch.chdir(module_dir)
+
+    with pytest.raises(SystemExit):
+        main(["tfdocs", "--emit-index", str(path), "--name", "net", "--dry-run"])
+
+    # A single module index is one JSON document.
+    record = json.loads(path.read_text())
+    assert record["module"] == "net"
+    assert record["path"] == "."
+    assert [v["name"] for v in record["variables"]] == ["var2", "var1"]
+
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs", "--emit-index", str(path)])
+    assert exc_info.value.code == -1
+    assert "Cannot find" in capsys.readouterr().out
+
+
+def test_main_emit_index_recursive(module_dir, tmp_path, capsys):
+    path = tmp_path / "index.json"
+    argv = ["tfdocs", "-r", str(tmp_path), "--emit-index", str(path), "--source", "x"]
+
+    with pytest.raises(SystemExit):
+        main(argv + ["-j", "1"])
+
+    assert [json.loads(line)["path"] for line in path.read_text().splitlines()] == [
+        str(module_dir)
+    ]
+    assert sorted(os.listdir(tmp_path)) == ["index.json", "network"]
+
+
+def assert_spans_match_disk(record, module_dir):
+    for variable in record["variables"]:
+        start, end = variable["span"]
+        text = (module_dir / variable["file"]).read_bytes()[start:end].decode()
+        assert text.startswith(f'variable "{variable["name"]}" {{')
+        assert text.endswith("}")
+
+
+def test_main_emit_index_after_formatting(module_dir, tmp_path, monkeypatch):
+    path = tmp_path / "index.json"
+    monkeypatch.chdir(module_dir)
+
+    with pytest.raises(SystemExit):
+        main(["tfdocs", "-f", "--emit-index", str(path), "--source", "x"])
+    assert (module_dir / "variables.tf").read_text().startswith('variable "var1"')
+    assert_spans_match_disk(json.loads(path.read_text()), module_dir)
+
+    (module_dir / "variables.tf").write_bytes(mock_variables_tf.encode())
+    argv = ["tfdocs", "-r", str(tmp_path), "--emit-index", str(path), "--source", "x"]
+    with pytest.raises(SystemExit):
+        main(argv + ["-f", "-j", "1", "--no-cache"])
+    assert_spans_match_disk(json.loads(path.read_text()), module_dir)
+
+
+def test_main_emit_index_reuses_worker_records(module_dir, tmp_path, monkeypatch):
+    (tmp_path / "empty").mkdir()
+    (tmp_path / "empty" / "variables.tf").write_text("")
+    path = tmp_path / "index.json"
+    argv = ["tfdocs", "-r", str(tmp_path), "--emit-index", str(path), "--source", "x", "-j", "2"]
+
+    calls = []
+    module_record = index.module_record
+
+    def counting(module_dir, *args):
+        calls.append(module_dir)  # only seen when called in this process
+        return module_record(module_dir, *args)
+
+    monkeypatch.setattr(index, "module_record", counting)
+
+    # The workers index the modules they process, nothing is parsed again here.
+    for _ in range(2):
+        with pytest.raises(SystemExit):
+            main(argv)
+    assert calls == []
+    records = path.read_text()
+    assert [json.loads(line)["path"] for line in records.splitlines()] == [
+        str(tmp_path / "empty"),
+        str(module_dir),
+    ]
+
+    # Up to date modules are cache hits now; only those are parsed here.
+    with pytest.raises(SystemExit):
+        main(argv)
+    assert sorted(calls) == [str(tmp_path / "empty"), str(module_dir)]
+    assert path.read_text() == records
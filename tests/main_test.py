@@ -131,4 +131,76 @@ def test_cli_entrypoint_os_error(mock_main):
     mock_main.side_effect = OSError(errno.EACCES, "Permission denied")
     with pytest.raises(OSError) as exc_info:
         _cli_entrypoint()
-    assert exc_info.value.errno == errno.EACCES 
\ No newline at end of file
+    assert exc_info.value.errno == errno.EACCES 
+
+mock_variables_tf = """variable "var1" {
+  type = string
+  description = "This is variable 1"
+}
+"""
+
+
+def test_main_check(tmp_path, monkeypatch, capsys):
+    """Test --check reports stale files without writing or printing them."""
+    (tmp_path / "variables.tf").write_text(mock_variables_tf)
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs", "--check", "--source", "tfdocs"])
+    assert exc_info.value.code == -1
+    assert capsys.readouterr().out == "stale: README.md\n"
+    assert not (tmp_path / "README.md").exists()
+
+    with pytest.raises(SystemExit):
+        main(["tfdocs", "--source", "tfdocs"])
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs", "--check", "-f", "--source", "tfdocs"])
+    assert exc_info.value.code == 0
+    assert capsys.readouterr().out == "ok: README.md\nok: variables.tf\n"
+
+
+def test_main_check_paths(tmp_path, capsys):
+    """Test --check over module directories given as arguments."""
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "variables.tf").write_text(mock_variables_tf)
+
+    with pytest.raises(SystemExit):
+        main(["tfdocs", "--source", "tfdocs", str(tmp_path / "a")])
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs", "--check", "--source", "tfdocs", str(tmp_path)])
+    assert exc_info.value.code == -1
+    assert capsys.readouterr().out.splitlines() == [
+        f"ok: {tmp_path / 'a' / 'README.md'}",
+        f"stale: {tmp_path / 'b' / 'README.md'}",
+    ]
+
+
+def test_main_missing_variables_file(tmp_path, monkeypatch, capsys):
+    """Test a missing variables file is reported with exit code -1."""
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs"])
+    assert exc_info.value.code == -1
+    assert "ERROR: Cannot find variables.tf" in capsys.readouterr().out
+
+
+def test_main_timings_and_profile(tmp_path, monkeypatch, capsys):
+    """Test --timings prints a phase breakdown to stderr and --profile writes stats."""
+    (tmp_path / "variables.tf").write_text(mock_variables_tf)
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs", "--timings", "--profile", "out.pstats", "--source", "tfdocs"])
+    assert exc_info.value.code == -1
+
+    captured = capsys.readouterr()
+    assert "Updated: README.md" in captured.out
+    assert captured.err.startswith("Timings:\n  parse ")
+    assert "  write " in captured.err
+    assert (tmp_path / "out.pstats").stat().st_size > 0
@@ -0,0 +1,100 @@
+import pytest
+
+from tfdocs import reader
+from tfdocs import readme
+
+variables_tf = """variable "var1" {
+  type = string
+  description = "This is variable 1"
+}
+
+variable "var2" {
+  type = list(object({
+    name = string
+  }))
+  description = "This is variable 2"
+  default = []
+}
+"""
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(content: bytes) -> str:
+        path = tmp_path / "variables.tf"
+        path.write_bytes(content)
+        return str(path)
+
+    return write
+
+
+def test_iter_variable_blocks(write):
+    data = variables_tf.encode()
+    with reader.open_variables(write(data)) as buf:
+        blocks = list(reader.iter_variable_blocks(buf))
+
+        assert [b.name for b in blocks] == ["var1", "var2"]
+        assert data[blocks[0].start : blocks[0].end].startswith(b'variable "var1" {')
+        assert data[blocks[0].start : blocks[0].end].endswith(b"}")
+        assert reader.block_lines(buf, blocks[1])[0] == 'variable "var2" {'
+
+
+def test_other_blocks_are_not_bracket_counted(write):
+    data = (
+        b'locals {\n  m = { for k, v in var.x : k => v }\n  big = var.a > var.b\n}\n\n'
+        b'resource "x" "y" {\n  count = var.n < 2 ? 1 : 0\n}\n\n'
+        b'variable "after" {\n  type = string\n}\n'
+    )
+    with reader.open_variables(write(data)) as buf:
+        blocks = list(reader.iter_variable_blocks(buf))
+
+    assert [b.name for b in blocks] == ["after"]
+    assert data[blocks[0].start : blocks[0].end] == b'variable "after" {\n  type = string\n}'
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        variables_tf.encode(),
+        variables_tf.replace("\n", "\r\n").encode(),
+        reader.BOM + variables_tf.encode(),
+        reader.BOM + variables_tf.replace("\n", "\r\n").encode(),
+    ],
+    ids=["lf", "crlf", "bom", "bom-crlf"],
+)
+def test_line_endings_and_bom(write, data, tmp_path):
+    rd = readme.Readme(str(tmp_path / "README.md"), write(data))
+
+    assert [v["name"] for v in rd.variables] == ["var1", "var2"]
+    assert rd.variables[1]["type"] == "list(object({name = string}))"
+    assert rd.variables[1]["description"] == '"This is variable 2"'
+
+
+def test_empty_file(write, tmp_path):
+    with reader.open_variables(write(b"")) as buf:
+        assert list(reader.iter_variable_blocks(buf)) == []
+        assert reader.content_equals(buf, "\n")
+
+    rd = readme.Readme(str(tmp_path / "README.md"), write(b""))
+    assert rd.variables == []
+
+
+def test_content_equals(write):
+    with reader.open_variables(write(b"\n  abc\n\n")) as buf:
+        assert reader.content_equals(buf, "abc\n")
+        assert not reader.content_equals(buf, "abd\n")
+        assert not reader.content_equals(buf, "abcd")
+
+    with reader.open_variables(write(reader.BOM + b"a\r\nb\r\n")) as buf:
+        assert reader.content_equals(buf, "a\nb")
+        assert not reader.content_equals(buf, "a\r\nc")
+
+
+def test_formatted_crlf_file_is_unchanged(write, tmp_path):
+    rd = readme.Readme(str(tmp_path / "README.md"), write(variables_tf.encode()))
+    formatted = rd.variables_text()
+
+    rd = readme.Readme(
+        str(tmp_path / "README.md"), write(formatted.replace("\n", "\r\n").encode())
+    )
+    assert rd.variables_changed is False
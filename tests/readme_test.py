@@ -1,6 +1,9 @@
 from tfdocs import readme
 from tfdocs import utils
+from tfdocs.__main__ import main
+from tfdocs.errors import TfdocsError
 import os
+import threading
 import pytest
 import tempfile
 
@@ -159,3 +162,218 @@ def test_write_readme(temp_files):
     )
 
     assert content.strip() == expected_readme_content.strip()
+
+
+def test_scan_module(temp_files):
+    variables_file, readme_file = temp_files
+    module_dir = os.path.dirname(variables_file)
+    with open(os.path.join(module_dir, "variables-network.tf"), "w") as f:
+        f.write('variable "cidr" {\n  type = string\n  description = "Network CIDR"\n}\n')
+    with open(os.path.join(module_dir, "main.tf"), "w") as f:
+        f.write('resource "null_resource" "this" {}\n')
+
+    rd = readme.Readme(readme_file, variables_file, module_name="example", module_source="tfdocs", scan_module=True)
+
+    assert [v["name"] for v in rd.variables] == ["var1", "var2", "var3", "var4", "var5"]
+    assert [v["name"] for v in rd.module_variables] == ["cidr", "var1", "var2", "var3", "var4", "var5"]
+    assert "  cidr = <STRING>          # Network CIDR" in rd.construct_readme()
+    assert "cidr" not in rd.variables_text()
+
+    rd = readme.Readme(readme_file, variables_file, module_name="example", module_source="tfdocs")
+    assert not any("cidr" in line for line in rd.construct_readme())
+
+
+def test_scan_module_after_expressions(temp_files):
+    variables_file, readme_file = temp_files
+    main_file = os.path.join(os.path.dirname(variables_file), "main.tf")
+    with open(main_file, "w") as f:
+        f.write(
+            "locals {\n"
+            "  m = { for k, v in var.x : k => v }\n"
+            "  big = length(var.x) > 3\n"
+            "}\n\n"
+            'variable "from_main" {\n  type = string\n  description = "After locals"\n}\n'
+        )
+
+    rd = readme.Readme(readme_file, variables_file, module_name="example", module_source="tfdocs", scan_module=True)
+    assert "from_main" in [v["name"] for v in rd.module_variables]
+    assert any("from_main = <STRING>" in line for line in rd.construct_readme())
+
+
+def test_scan_module_unreadable_file(temp_files, monkeypatch, capsys):
+    variables_file, readme_file = temp_files
+    module_dir = os.path.dirname(variables_file)
+    main_file = os.path.join(module_dir, "main.tf")
+    with open(main_file, "wb") as f:
+        f.write(b'variable "cafe" {\n  description = "Caf\xe9"\n}\n')
+
+    with pytest.raises(TfdocsError, match="Cannot read .*main.tf"):
+        readme.Readme(readme_file, variables_file, module_name="example", module_source="tfdocs", scan_module=True)
+
+    monkeypatch.chdir(module_dir)
+    with pytest.raises(SystemExit) as exc_info:
+        main(["tfdocs", "--all-files", "--source", "tfdocs", "--no-cache"])
+    assert exc_info.value.code == -1
+    assert "main.tf" in capsys.readouterr().out
+
+
+def test_scan_variables_file_skips_files_without_variables(temp_files, monkeypatch):
+    variables_file, _ = temp_files
+    main_file = os.path.join(os.path.dirname(variables_file), "main.tf")
+    with open(main_file, "w") as f:
+        f.write('resource "null_resource" "this" {}\n')
+
+    def fail(buf):
+        raise AssertionError("main.tf was parsed")
+
+    monkeypatch.setattr(readme.reader, "iter_variable_blocks", fail)
+    assert readme.scan_variables_file(main_file) == ([], 0)
+
+
+def test_write_skips_unchanged_files(temp_files):
+    variables_file, readme_file = temp_files
+    rd = readme.Readme(readme_file, variables_file, module_name="example", module_source="tfdocs")
+    assert rd.write_variables() is True
+    assert rd.write_readme() is True
+
+    def stats():
+        return [(os.stat(path).st_ino, os.stat(path).st_mtime_ns) for path in (variables_file, readme_file)]
+
+    before = stats()
+
+    rd = readme.Readme(readme_file, variables_file, module_name="example", module_source="tfdocs")
+    assert rd.write_variables() is False
+    assert rd.write_readme() is False
+    assert stats() == before
+
+
+def legacy_parse_block(name, block):
+    """The per-line process_line_block() probing parse_block() replaced."""
+    str_len = 0
+    type_content, default_content, description_content, type_override, cont = "", "", "", None, None
+    for line_block in block:
+        type_content, cont = utils.process_line_block(line_block, "type", type_content, cont)
+        type_override, cont = utils.process_line_block(line_block, "type_override", type_override, cont)
+        type_len_content = type_override if type_override else type_content
+        if name and type_len_content:
+            str_len = max(str_len, len(f"  {name} = <{type_len_content}>"))
+        default_content, cont = utils.process_line_block(line_block, "default", default_content, cont)
+        description_content, cont = utils.process_line_block(line_block, "description", description_content, cont)
+
+    attributes = {
+        "name": name or "",
+        "type_override": type_override,
+        "type": type_content if type_content else "unknown",
+        "description": description_content if description_content else '"No description provided"',
+    }
+    if default_content:
+        attributes["default"] = default_content
+    return attributes, str_len
+
+
+@pytest.mark.parametrize(
+    "block",
+    [
+        ['variable "v" {', "  type = string", '  description = "d"', "}"],
+        ['variable "v" {', "  type = map(object({", "    a = string", "  }))", "  default = {}", "}"],
+        ['variable "v" {', "  #tfdocs: type=object", "  type = any", "  default = [", '    "a",', "  ]", "}"],
+        ['variable "v" {', "  type = list(", "  )default = 1", "  description = x", "}"],
+        ['variable "v" {', "  type = object({", "  default = 1", "  })", '  description = "a = b"', "}"],
+        ['variable "v" {', '  default = "\\"("', "  type = string", "  type = number", "}"],
+        ['variable "v" {', "  description = <<EOT", "  text", "}"],
+        ['variable "v" {', "  default = [1, 2", "  ]", "  default = 3", "}"],
+    ],
+)
+def test_parse_block_matches_line_probing(block):
+    assert readme.parse_block("v", block) == legacy_parse_block("v", block)
+
+
+def test_variable_record():
+    item, _ = readme.parse_block("v", ['variable "v" {', "  type = " + "string", "}"])
+    other, _ = readme.parse_block("w", ['variable "w" {', "  type = " + "".join(["str", "ing"]), '  default = "x"', "}"])
+
+    assert item == {"name": "v", "type_override": None, "type": "string", "description": '"No description provided"'}
+    assert "default" not in item and "default" in other
+    assert item.get("default") is None and other.get("default") == '"x"'
+    assert item.get("missing", 1) == 1
+    with pytest.raises(KeyError):
+        item["default"]
+    assert dict(other)["default"] == '"x"'
+    assert {**item, "name": "z"}["name"] == "z"
+    assert item.type is other.type  # interned
+    assert not hasattr(item, "__dict__")
+
+
+def test_sorted_variables_view(temp_files):
+    variables_file, readme_file = temp_files
+    with open(variables_file, "w") as f:
+        f.write(''.join(f'variable "{name}" {{\n  type = string\n}}\n' for name in ("b", "a", "c", "a")))
+
+    rd = readme.Readme(readme_file, variables_file)
+
+    assert isinstance(rd.sorted_variables, readme.VariablesView)
+    assert [item["name"] for item in rd.sorted_variables] == ["a", "a", "b", "c"]
+    assert rd.sorted_variables[0] is rd.variables[1]
+    assert rd.sorted_variables[1] is rd.variables[3]
+    assert rd.sorted_variables[-1]["name"] == "c"
+    assert [item["name"] for item in rd.sorted_variables[1:3]] == ["a", "b"]
+    assert rd.sorted_variables == sorted(rd.variables, key=lambda k: k["name"])
+    assert len(rd.sorted_variables) == 4
+
+
+def test_render_once(temp_files, monkeypatch, capsys):
+    variables_file, readme_file = temp_files
+    calls = {"source": 0, "tf_file": 0}
+
+    def generate_source(*args):
+        calls["source"] += 1
+        return "tfdocs"
+
+    def construct_tf_file(variables):
+        calls["tf_file"] += 1
+        return utils.construct_tf_file(variables)
+
+    monkeypatch.setattr(readme, "generate_source", generate_source)
+    monkeypatch.setattr(readme, "construct_tf_file", construct_tf_file)
+
+    rd = readme.Readme(readme_file, variables_file, module_name="example")
+    rd.print_variables_file()
+    rd.write_variables()
+    rd.print_readme()
+    rd.construct_readme().append("mutated")
+    assert rd.get_status() == {"readme": True, "variables": True}
+    rd.write_readme()
+    assert calls == {"source": 1, "tf_file": 1}
+    assert "mutated" not in rd.readme_text()
+
+    rd.reload_readme()
+    assert rd.get_status()["readme"] is False
+    assert calls == {"source": 1, "tf_file": 1}
+    capsys.readouterr()
+
+
+def test_background_loading(temp_files, monkeypatch):
+    variables_file, readme_file = temp_files
+    released = threading.Event()
+    threads = []
+
+    def generate_source(*args):
+        threads.append(threading.current_thread())
+        # Blocks until the Readme is constructed, so it must not run in __init__.
+        assert released.wait(5)
+        return "tfdocs"
+
+    monkeypatch.setattr(readme, "generate_source", generate_source)
+
+    rd = readme.Readme(readme_file, variables_file, module_name="example")
+    released.set()
+    assert '  source = "tfdocs"' in rd.readme_text()
+    assert threads and threads[0] is not threading.main_thread()
+
+    # A README changed on disk is read again rather than taken from the preload.
+    rd.write_readme()
+    with open(readme_file, "a") as f:
+        f.write("Appended\n")
+    rd.reload_readme()
+    assert rd.get_status()["readme"] is False
+    assert rd.readme_text().endswith("Appended\n")
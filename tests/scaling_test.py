@@ -0,0 +1,144 @@
+"""
+Complexity regression tests: pathological inputs are generated at two sizes
+and the time ratio is compared with the size ratio. Linear code stays near
+SIZE_RATIO, quadratic code lands near SIZE_RATIO ** 2, so the bound leaves
+room for timer noise while still catching the regressions these inputs used
+to trigger. Being timing based, they are marked perf (see conftest.py); the
+deep nesting tests at the end are not.
+"""
+
+import contextlib
+import sys
+
+import pytest
+
+from benchmarks import corpus
+from benchmarks.run import best_of
+from tfdocs import hcl, readme, utils
+
+SIZE_RATIO = 8
+MAX_TIME_RATIO = SIZE_RATIO * 3
+
+
+def assert_linear(make_run, small):
+    """``make_run(size)`` prepares the input and returns the call to time."""
+    runs = [make_run(small), make_run(small * SIZE_RATIO)]
+    for run in runs:
+        run()  # warm up
+
+    small_time, large_time = (best_of(run, 3) for run in runs)
+    ratio = large_time / max(small_time, 1e-6)
+    assert ratio < MAX_TIME_RATIO, (
+        f"{SIZE_RATIO}x the input took {ratio:.1f}x the time "
+        f"({small_time * 1000:.1f}ms -> {large_time * 1000:.1f}ms)"
+    )
+
+
+def module_render(tmp_path, text):
+    """Parse and render a module holding ``text``, without the format memo."""
+    module = tmp_path / f"module{len(list(tmp_path.iterdir()))}"
+    module.mkdir()
+    (module / "variables.tf").write_text(text)
+
+    def run():
+        utils.clear_format_cache()
+        rd = readme.Readme(
+            str(module / "README.md"), str(module / "variables.tf"), "m", "tfdocs"
+        )
+        return rd.variables_text(), rd.readme_text()
+
+    return run
+
+
+def variable(type_expr, default=None):
+    lines = ['variable "v" {', f"  type = {type_expr}", '  description = "d"']
+    if default is not None:
+        lines.append(f"  default = {default}")
+    return "\n".join(lines + ["}", ""])
+
+
+@pytest.mark.perf
+def test_smart_split_long_line():
+    def make_run(size):
+        text = ", ".join(f'"item-{i}"' for i in range(size))
+        return lambda: utils.smart_split(text)
+
+    assert_linear(make_run, 5_000)
+
+
+@pytest.mark.perf
+def test_format_block_long_line():
+    def make_run(size):
+        text = corpus.list_default(size)
+        return lambda: utils.format_block(text, 0, inline=True)
+
+    assert_linear(make_run, 1_000)
+
+
+@pytest.mark.perf
+def test_single_line_default(tmp_path):
+    def make_run(size):
+        return module_render(
+            tmp_path, variable("list(string)", corpus.list_default(size))
+        )
+
+    assert_linear(make_run, 1_000)
+
+
+@pytest.mark.perf
+def test_long_list_default(tmp_path):
+    # One default spread over ``size`` lines.
+    def make_run(size):
+        return module_render(tmp_path, corpus.variable_block(0, list_length=size) + "\n")
+
+    assert_linear(make_run, 1_250)
+
+
+@pytest.mark.perf
+def test_nested_type(tmp_path):
+    def make_run(size):
+        return module_render(tmp_path, variable(corpus.nested_type(size)))
+
+    assert_linear(make_run, 20)
+
+
+@contextlib.contextmanager
+def recursion_limit(limit):
+    # A low limit keeps "deeper than the limit" cheap to generate and format.
+    previous = sys.getrecursionlimit()
+    sys.setrecursionlimit(limit)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(previous)
+
+
+def test_nesting_past_recursion_limit(tmp_path):
+    depth = 600
+    type_expr = "object({a = " * depth + "string" + "})" * depth
+    default = "{a = " * depth + '"leaf"' + "}" * depth
+    run = module_render(tmp_path, variable(type_expr, default))
+
+    with recursion_limit(300):
+        variables, readme_text = run()
+
+    assert variables.count("object({") == depth
+    assert variables.count("a = ") == depth * 2
+    assert variables.count('"leaf"') == 1
+    assert readme_text.count("  v = <OBJECT(") == 1
+
+
+@pytest.mark.parametrize("inline", [False, True])
+def test_format_past_recursion_limit(inline):
+    depth = 600
+    text = "[" * depth + "1" + "]" * depth
+    raw = "{a = " * depth + "(" + "}" * depth  # unbalanced: format_block() only
+
+    with recursion_limit(300):
+        formatted = hcl.format_expression(text, 1, inline)
+        raw_formatted = utils.format_block(raw, 1, inline)
+
+    assert formatted.count("[") == depth
+    assert formatted.splitlines()[depth].strip() == "1"
+    assert raw_formatted.count("a = ") == depth
+    assert raw_formatted.count("(") == 1
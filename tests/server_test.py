@@ -0,0 +1,201 @@
+import io
+import json
+import random
+
+import pytest
+
+import tfdocs
+from tfdocs import server
+from tfdocs.cli import Options
+
+mock_variables_tf = """variable "var2" {
+  type = number
+  description = "This is variable 2"
+}
+
+variable "var1" {
+  type = string
+  description = "This is variable 1"
+}
+"""
+
+
+def variables_file(count):
+    return "".join(
+        f'variable "var{i}" {{\n  type = string\n  description = "Variable {i}"\n}}\n\n'
+        for i in range(count)
+    )
+
+
+def request(srv, method, params=None, request_id=1):
+    return srv.handle({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+
+
+def notify(srv, method, params):
+    assert srv.handle({"jsonrpc": "2.0", "method": method, "params": params}) is None
+
+
+def open_document(srv, path, text):
+    notify(srv, "textDocument/didOpen", {"textDocument": {"uri": path.as_uri(), "text": text}})
+
+
+@pytest.fixture
+def module_dir(tmp_path):
+    module = tmp_path / "example"
+    module.mkdir()
+    (module / "variables.tf").write_text(mock_variables_tf)
+    return module
+
+
+def test_initialize():
+    response = request(server.Server(Options()), "initialize", {})
+
+    capabilities = response["result"]["capabilities"]
+    assert capabilities["documentFormattingProvider"] is True
+    assert capabilities["textDocumentSync"] == 1
+
+
+def test_formatting_uses_open_buffer(module_dir):
+    srv = server.Server(Options(source="tfdocs"))
+    variables = module_dir / "variables.tf"
+    uri = {"textDocument": {"uri": variables.as_uri()}}
+
+    # On disk the file is unsorted, in the editor it is already formatted.
+    formatted = tfdocs.render(str(module_dir), Options(source="tfdocs")).variables
+    open_document(srv, variables, formatted)
+    assert request(srv, "textDocument/formatting", uri)["result"] == []
+
+    notify(
+        srv,
+        "textDocument/didChange",
+        {**uri, "contentChanges": [{"text": mock_variables_tf}]},
+    )
+    edits = request(srv, "textDocument/formatting", uri)["result"]
+    assert edits == [
+        {
+            "range": {"start": {"line": 0, "character": 0}, "end": {"line": 9, "character": 0}},
+            "newText": formatted,
+        }
+    ]
+    assert variables.read_text() == mock_variables_tf
+
+
+def test_render_preview(module_dir):
+    srv = server.Server(Options(source="tfdocs"))
+    readme = module_dir / "README.md"
+    open_document(srv, readme, "# Title\n\n<!-- TFDOCS START -->\n<!-- TFDOCS END -->\n")
+
+    result = request(srv, "tfdocs/render", {"uri": readme.as_uri()})["result"]
+
+    assert result["readme"].startswith("# Title\n\n<!-- TFDOCS START -->\n```\n")
+    assert "  var1 = <STRING>" in result["readme"]
+    assert result["readme_changed"] is True
+    assert result["variables_changed"] is True
+    assert not readme.exists()
+
+    notify(srv, "textDocument/didClose", {"textDocument": {"uri": readme.as_uri()}})
+    result = request(srv, "tfdocs/render", {"path": str(module_dir)})["result"]
+    expected = tfdocs.render(str(module_dir), Options(source="tfdocs"))
+    assert result["readme"] == expected.readme
+    assert result["variables"] == expected.variables
+
+
+def test_render_all_files_uses_open_buffers(module_dir):
+    srv = server.Server(Options(source="tfdocs", all_files=True))
+    extra = module_dir / "variables-network.tf"
+    extra.write_text('variable "cidr" {\n  type = string\n  description = "Range"\n}\n')
+
+    result = request(srv, "tfdocs/render", {"path": str(module_dir)})["result"]
+    assert "  cidr = <STRING>" in result["readme"]
+
+    open_document(srv, extra, 'variable "subnets" {\n  type = list(string)\n  description = "Subnets"\n}\n')
+    result = request(srv, "tfdocs/render", {"path": str(module_dir)})["result"]
+    assert "  subnets = <LIST(STRING)>" in result["readme"]
+    assert "cidr" not in result["readme"]
+
+
+def test_incremental_parse():
+    state = server.ModuleState()
+    content = variables_file(50)
+    state.update(content.encode())
+    assert state.parsed_blocks == 50
+
+    edited = content.replace('"Variable 20"', '"Edited"')
+    blocks = state.update(edited.encode())
+    assert state.parsed_blocks == 51
+    assert blocks[20].item["description"] == '"Edited"'
+    assert [entry[:3] for entry in blocks] == [
+        entry[:3] for entry in server.ModuleState().update(edited.encode())
+    ]
+
+    state.update(edited.encode())
+    assert state.parsed_blocks == 51
+
+
+def test_incremental_parse_random_edits():
+    rng = random.Random(7)
+    state = server.ModuleState()
+    content = variables_file(30)
+    pieces = ["", "\n", "}", "{", "#", 'variable "new" {\n  type = bool\n}\n', '"', "x = [1, 2]\n"]
+
+    for _ in range(300):
+        start = rng.randrange(len(content) + 1)
+        end = min(len(content), start + rng.randrange(20))
+        content = content[:start] + rng.choice(pieces) + content[end:]
+
+        expected = server.ModuleState().update(content.encode())
+        assert [entry[:3] for entry in state.update(content.encode())] == [
+            entry[:3] for entry in expected
+        ]
+
+
+def test_errors(tmp_path):
+    srv = server.Server(Options())
+
+    response = request(srv, "tfdocs/render", {"path": str(tmp_path)})
+    assert response["error"]["code"] == -32803
+    assert "Cannot find" in response["error"]["message"]
+
+    assert request(srv, "unknown/method")["error"]["code"] == -32601
+    assert request(srv, "tfdocs/render", {})["error"]["code"] == -32602
+    assert srv.handle([])["error"]["code"] == -32600
+    notify(srv, "$/cancelRequest", {"id": 1})
+
+
+def frame(message):
+    body = json.dumps(message).encode()
+    return b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+
+
+def test_serve(module_dir):
+    stdin = io.BytesIO(
+        frame({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+        + b"Content-Length: 3\r\n\r\n{x}"
+        + frame(
+            {
+                "jsonrpc": "2.0",
+                "id": 2,
+                "method": "tfdocs/render",
+                "params": {"path": str(module_dir)},
+            }
+        )
+        + frame({"jsonrpc": "2.0", "id": 3, "method": "shutdown"})
+        + frame({"jsonrpc": "2.0", "method": "exit"})
+        + frame({"jsonrpc": "2.0", "id": 4, "method": "initialize"})
+    )
+    stdout = io.BytesIO()
+
+    server.Server(Options(source="tfdocs")).serve(stdin, stdout)
+
+    stdout.seek(0)
+    responses = []
+    while True:
+        message = server.read_message(stdout)
+        if message is None:
+            break
+        responses.append(message)
+
+    assert [response.get("id") for response in responses] == [1, None, 2, 3]
+    assert responses[1]["error"]["code"] == -32700
+    assert "  var1 = <STRING>" in responses[2]["result"]["readme"]
+    assert responses[3]["result"] is None
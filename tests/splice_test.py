@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from tfdocs import splice
+
+SECTION = ["```", "module <example> {", '  source = "tfdocs"', "}", "```"]
+
+
+def legacy_splice(content, section, module_name):
+    """The line based splicing used before tfdocs.splice, as (text, changed)."""
+    if content is not None:
+        lines = content.split("\n")
+        start_index = end_index = None
+        for i, line in enumerate(lines):
+            if "<!-- TFDOCS START -->" in line:
+                start_index = i
+            elif "<!-- TFDOCS END -->" in line:
+                end_index = i
+
+        if start_index is not None and end_index is not None:
+            constructed = lines[:]
+            del constructed[start_index + 1 : end_index]
+            constructed[start_index + 1 : start_index + 1] = section
+            return constructed, constructed != lines
+
+    return (
+        [f"# {module_name} module", "", "<!-- TFDOCS START -->"]
+        + section
+        + ["<!-- TFDOCS END -->", ""]
+    ), True
+
+
+def legacy_text(lines):
+    if lines and lines[-1] == "":
+        lines = lines[:-1]
+    return "".join("%s\n" % line for line in lines)
+
+
+def spliced(raw, section=SECTION):
+    buf = None if raw is None else splice.normalize(raw.encode())
+    data = splice.section_bytes(section)
+    text = b"".join(splice.iter_chunks(buf, data, "example")).decode()
+    found = None if buf is None else splice.find_splice(buf)
+    changed = found is None or not splice.is_unchanged(buf, found, data)
+    return text, changed
+
+
+def expected(raw, section=SECTION):
+    content = None
+    if raw is not None:
+        content = raw.replace("\r\n", "\n").replace("\r", "\n")
+    lines, changed = legacy_splice(content, section, "example")
+    return legacy_text(lines), changed
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        None,
+        "",
+        "# Title\n",
+        "<!-- TFDOCS START -->\n<!-- TFDOCS END -->\n",
+        "<!-- TFDOCS START -->\n<!-- TFDOCS END -->",
+        "<!-- TFDOCS START -->",
+        "<!-- TFDOCS START -->\n",
+        "<!-- TFDOCS END -->\nmiddle\n<!-- TFDOCS START -->\ntail\n",
+        "<!-- TFDOCS START --><!-- TFDOCS END -->\n<!-- TFDOCS END -->\n",
+        "<!-- TFDOCS START -->\n<!-- TFDOCS END --> <!-- TFDOCS START -->\n",
+        "a\r\n<!-- TFDOCS START -->\r\nold\r\n<!-- TFDOCS END -->\r\nb\r\n",
+        "a\r<!-- TFDOCS START -->\rold\r<!-- TFDOCS END -->\rb",
+        "1\n<!-- TFDOCS START -->\nx\n<!-- TFDOCS END -->\n2\n"
+        "<!-- TFDOCS START -->\ny\n<!-- TFDOCS END -->\n\n\n",
+    ],
+)
+def test_matches_line_splicing(raw):
+    assert spliced(raw) == expected(raw)
+
+
+def test_unchanged():
+    readme, changed = spliced("# Title\n<!-- TFDOCS START -->\n<!-- TFDOCS END -->\nEnd")
+    assert changed is True
+    assert spliced(readme) == (readme, False)
+    assert spliced(readme + "\n\nmore\n") == (readme + "\n\nmore\n", False)
+
+
+def test_random_files():
+    rng = random.Random(3)
+    pieces = [
+        "<!-- TFDOCS START -->",
+        "<!-- TFDOCS END -->",
+        "\n",
+        "\r\n",
+        "\r",
+        "text",
+        " ",
+    ] + SECTION
+
+    for _ in range(3000):  # the generated section is never empty
+        raw = "".join(rng.choice(pieces) for _ in range(rng.randrange(12)))
+        assert spliced(raw) == expected(raw), raw
+        section = SECTION[: rng.randrange(1, len(SECTION) + 1)]
+        assert spliced(raw, section) == expected(raw, section), raw
+
+
+def test_large_copies_are_chunked(monkeypatch):
+    monkeypatch.setattr(splice, "_COPY_SIZE", 4)
+    raw = "head line\n<!-- TFDOCS START -->\n<!-- TFDOCS END -->\ntail text\n"
+    buf = raw.encode()
+    chunks = list(splice.iter_chunks(buf, b"x", "example"))
+
+    assert max(len(chunk) for chunk in chunks if chunk != b"x") <= 4
+    assert b"".join(chunks) == b"head line\n<!-- TFDOCS START -->\nx\n<!-- TFDOCS END -->\ntail text\n"
@@ -0,0 +1,66 @@
+import json
+import threading
+import time
+
+from tfdocs import timings
+
+
+@timings.timed("parse")
+def parse():
+    time.sleep(0.01)
+    return format_()
+
+
+@timings.timed("format")
+def format_():
+    time.sleep(0.05)
+    return "formatted"
+
+
+def test_timed_without_recording():
+    assert parse() == "formatted"
+    assert timings._active is None
+
+
+def test_nested_phases_are_exclusive():
+    with timings.record() as recorder:
+        assert parse() == "formatted"
+
+    assert 0.01 <= recorder.phases["parse"] < 0.05
+    assert recorder.phases["format"] >= 0.05
+    assert recorder.phases["write"] == 0.0
+    assert timings._active is None
+
+
+def test_phases_on_threads():
+    with timings.record() as recorder:
+        thread = threading.Thread(target=format_)
+        thread.start()
+        parse()
+        thread.join()
+
+    # The background phase neither nests in nor subtracts from "parse".
+    assert 0.01 <= recorder.phases["parse"] < 0.05
+    assert recorder.phases["format"] >= 0.1
+
+
+def test_add_module():
+    with timings.record() as recorder:
+        timings.add_module("a", {"parse": 1.0, "write": 0.5})
+        timings.add_module("b", {"parse": 2.0})
+    timings.add_module("ignored", {"parse": 5.0})
+
+    assert recorder.phases["parse"] == 3.0
+    assert recorder.phases["write"] == 0.5
+
+    data = json.loads(timings.format_timings(recorder, "json"))
+    assert data["version"] == timings.SCHEMA_VERSION
+    assert data["modules"] == [
+        {"module": "a", "phases": {"parse": 1.0, "write": 0.5}},
+        {"module": "b", "phases": {"parse": 2.0}},
+    ]
+
+    text = timings.format_timings(recorder).splitlines()
+    assert text[0] == "Timings (2 modules processed):"
+    assert text[1] == "  parse       3000.0 ms"
+    assert text[-1].startswith("  total ")
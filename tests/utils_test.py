@@ -1,3 +1,7 @@
+import os
+
+import pytest
+
 from tfdocs import utils
 
 
@@ -36,6 +40,34 @@ def test_count_blocks():
     assert utils.count_blocks(["{}","{}","{"]) is False
 
 
+def test_block_counter():
+    counter = utils.BlockCounter()
+    assert counter.feed('variable "x" {') is False
+    assert counter.feed('  default = ["a", "b"') is False
+    assert counter.feed("  ]") is False
+    assert counter.feed("}") is True
+
+    counter.reset()
+    assert counter.feed('default = ["{ \\') is False
+    assert counter.feed('"]') is False
+    assert counter.feed('"]') is True
+
+    counter = utils.BlockCounter()
+    assert counter.feed("{)") is False
+    assert counter.feed("}") is False
+
+    counter = utils.BlockCounter()
+    assert counter.feed(b'variable "x" {') is False
+    assert counter.feed(b'  default = "\\') is False
+    assert counter.feed(b'"}"') is False
+    assert counter.feed(b"}") is True
+
+    lines = ["{", '  a = "}"', "  b = [1,", "2]", "}"]
+    counter = utils.BlockCounter()
+    for i, line in enumerate(lines):
+        assert counter.feed(line) == utils.count_blocks(lines[: i + 1])
+
+
 def test_process_line_block():
     assert utils.process_line_block("type = string", "type", "", None) == (
         "string",
@@ -557,3 +589,84 @@ def test_generate_source():
         == "git@git.com:tfdocs//.?ref=<TAG>"
     )
     assert utils.generate_source("modules", "tfdocs", False) == "tfdocs"
+
+
+def test_atomic_write(tmp_path, monkeypatch):
+    path = tmp_path / "README.md"
+    utils.atomic_write(str(path), "first\n")
+    assert path.read_text() == "first\n"
+
+    path.chmod(0o640)
+    utils.atomic_write(str(path), "second\n")
+    assert path.read_text() == "second\n"
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["README.md"]
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(utils.os, "replace", fail)
+    with pytest.raises(OSError):
+        utils.atomic_write(str(path), "third\n")
+    assert path.read_text() == "second\n"
+    assert os.listdir(tmp_path) == ["README.md"]
+
+
+def test_atomic_write_symlink_and_umask(tmp_path, monkeypatch):
+    (tmp_path / "docs").mkdir()
+    target = tmp_path / "docs" / "README.md"
+    target.write_text("old\n")
+    link = tmp_path / "README.md"
+    link.symlink_to(os.path.join("docs", "README.md"))
+
+    utils.atomic_write(str(link), "new\n")
+    assert link.is_symlink()
+    assert target.read_text() == "new\n"
+    assert sorted(os.listdir(tmp_path / "docs")) == ["README.md"]
+
+    def no_umask(mask):
+        raise AssertionError("the process umask must not change")
+
+    previous = os.umask(0o027)
+    try:
+        with monkeypatch.context() as patched:
+            patched.setattr(utils.os, "umask", no_umask)
+            utils.atomic_write(str(tmp_path / "new.md"), "x\n")
+    finally:
+        os.umask(previous)
+    assert (tmp_path / "new.md").stat().st_mode & 0o777 == 0o640
+
+
+def test_atomic_write_chunks(tmp_path):
+    path = tmp_path / "README.md"
+    utils.atomic_write(str(path), iter([b"a\n", b"", "é\n".encode()]))
+    assert path.read_bytes() == "a\né\n".encode()
+
+
+def test_format_cache():
+    utils.clear_format_cache()
+    variable = {
+        "name": "tags",
+        "type_override": None,
+        "type": "map(string)",
+        "description": '"Tags"',
+        "default": "{a = 1}",
+    }
+
+    first = utils.construct_tf_variable(variable)
+    info = utils.format_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 2, 2)
+
+    assert utils.construct_tf_variable({**variable, "name": "labels"}) == first.replace("tags", "labels")
+    info = utils.format_cache_info()
+    assert (info.hits, info.misses) == (2, 2)
+    assert info.maxsize == utils.FORMAT_CACHE_SIZE
+
+    # Large expressions are not kept alive by the memo.
+    large = "[" + ", ".join(f'"item-{i}"' for i in range(1000)) + "]"
+    assert len(large) > utils.FORMAT_CACHE_MAX_TEXT
+    assert utils.format_cached(large, 0, True) == utils.format_expression(large, 0, True)
+    assert utils.format_cache_info().currsize == 2
+
+    utils.clear_format_cache()
+    assert utils.format_cache_info().currsize == 0
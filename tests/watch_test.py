@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from tfdocs import watch
+from tfdocs.cli import Options, get_parser
+
+mock_variables_tf = """variable "var1" {
+  type = string
+  description = "This is variable 1"
+}
+"""
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def module_dir(tmp_path):
+    (tmp_path / "variables.tf").write_text(mock_variables_tf)
+    return tmp_path
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+def running_watcher(request, module_dir):
+    watcher = watch.Watcher(
+        [str(module_dir)],
+        Options(format=False, source="tfdocs"),
+        debounce=0.1,
+        poll_interval=0.05,
+        use_inotify=request.param,
+    )
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop,), daemon=True)
+    thread.start()
+    assert wait_for(lambda: watcher.regenerations == 1)
+    yield watcher
+    stop.set()
+    thread.join(timeout=5)
+
+
+def test_regenerates_on_change(running_watcher, module_dir):
+    readme = module_dir / "README.md"
+    assert "var1 = <STRING>" in readme.read_text()
+
+    time.sleep(0.05)
+    (module_dir / "variables.tf").write_text(
+        mock_variables_tf.replace("var1", "renamed")
+    )
+
+    assert wait_for(lambda: "renamed = <STRING>" in readme.read_text())
+    assert wait_for(lambda: running_watcher.regenerations == 2)
+
+
+def test_debounces_bursts_and_ignores_own_writes(running_watcher, module_dir):
+    time.sleep(0.05)
+    for i in range(5):
+        (module_dir / "variables.tf").write_text(
+            mock_variables_tf.replace("var1", f"var_{i}")
+        )
+        time.sleep(0.01)
+
+    assert wait_for(lambda: "var_4 = <STRING>" in (module_dir / "README.md").read_text())
+    time.sleep(0.5)
+    assert running_watcher.regenerations == 2
+
+
+def test_readme_change_reuses_parsed_variables(running_watcher, module_dir, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("variables were parsed again")
+
+    monkeypatch.setattr(watch.readme, "Readme", fail)
+    time.sleep(0.05)
+    (module_dir / "README.md").write_text("# Custom\n\n<!-- TFDOCS START -->\n<!-- TFDOCS END -->\n")
+
+    assert wait_for(lambda: "var1 = <STRING>" in (module_dir / "README.md").read_text())
+    assert (module_dir / "README.md").read_text().startswith("# Custom")
+
+
+@pytest.mark.parametrize("use_inotify", [True, False], ids=["inotify", "polling"])
+def test_all_files_watches_other_tf_files(module_dir, use_inotify):
+    extra = module_dir / "variables-network.tf"
+    extra.write_text('variable "cidr" {\n  type = string\n  description = "Range"\n}\n')
+    watcher = watch.Watcher(
+        [str(module_dir)],
+        Options(format=False, source="tfdocs", all_files=True),
+        debounce=0.1,
+        poll_interval=0.05,
+        use_inotify=use_inotify,
+    )
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop,), daemon=True)
+    thread.start()
+    try:
+        readme = module_dir / "README.md"
+        assert wait_for(lambda: watcher.regenerations == 1)
+        assert "cidr = <STRING>" in readme.read_text()
+
+        time.sleep(0.05)
+        extra.write_text(extra.read_text().replace("cidr", "vpc_cidr"))
+        assert wait_for(lambda: "vpc_cidr = <STRING>" in readme.read_text())
+
+        if use_inotify:
+            (module_dir / "outputs.tf").write_text('variable "late" {\n  type = bool\n}\n')
+            assert wait_for(lambda: "late = <BOOL>" in readme.read_text())
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+
+
+@pytest.mark.parametrize("flag", ["--dry-run", "--check"])
+def test_report_only_flags_do_not_write(module_dir, flag, capsys):
+    unformatted = mock_variables_tf.replace("type = string", "type    = string")
+    (module_dir / "variables.tf").write_text(unformatted)
+    options = get_parser(["--watch", flag, "-f", "--source", "tfdocs", str(module_dir)])
+    watcher = watch.Watcher([str(module_dir)], options)
+
+    watcher.regenerate(str(module_dir), variables_changed=True)
+    assert (module_dir / "variables.tf").read_text() == unformatted
+    assert not (module_dir / "README.md").exists()
+    out = capsys.readouterr().out
+    assert "stale:" in out and "README.md" in out and "variables.tf" in out